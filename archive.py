@@ -0,0 +1,162 @@
+"""日ごとのアーカイブページと、ページ分割したアーカイブ一覧
+
+その日に初めて取得した記事を archive/YYYY-MM-DD.html に1日1ファイルで書き出す。
+取得日で分けるので、日付が変わった後にその日の記事が増えることはなく、書き出したページは変更しない
+（書き直さないので、配信側でいつまでもキャッシュしてよい）。
+
+一覧は古い順に PAGE_SIZE 日ずつ page-0001.html, page-0002.html, ... にまとめ、
+埋まったページはそれ以降変更しない。まだ埋まっていない最新の分は index.html に出す。
+1回の実行で書くのは、新しい日のページと、日付が加わった一覧ページ（index.html と、埋まった場合の page-NNNN.html）だけ。
+"""
+import os
+import re
+from datetime import date, datetime, time as dtime, timedelta
+
+from fileio import write_atomic
+
+ARCHIVE_DIR = "archive"
+PAGE_SIZE = 30             # 一覧の1ページあたりの日数
+BACKFILL_DAYS = 30         # アーカイブがないときに遡る日数の上限
+
+_DAY_FILE = re.compile(r"^(\d{4}-\d{2}-\d{2})\.html$")
+
+ARCHIVE_CSS = """
+body { font-family: 'Helvetica Neue', Arial, 'Hiragino Kaku Gothic ProN', 'Hiragino Sans', Meiryo, sans-serif;
+       background: #f5f7fa; color: #2c3e50; margin: 0; padding: 2em 1em; line-height: 1.6; }
+.container { max-width: 900px; margin: 0 auto; }
+h1 { font-size: 1.6em; margin-bottom: 0.3em; }
+h2 { font-size: 1.2em; margin: 1.5em 0 0.5em; border-left: 5px solid #3498db; padding-left: 0.5em; }
+nav { margin: 1em 0; display: flex; gap: 1.5em; flex-wrap: wrap; }
+a { color: #2980b9; text-decoration: none; }
+a:hover { text-decoration: underline; }
+ul { list-style: none; padding: 0; margin: 0; }
+li { background: white; border-radius: 8px; padding: 0.6em 1em; margin-bottom: 0.5em; }
+.news-date, .empty { color: #7f8c8d; font-size: 0.9em; }
+"""
+
+
+def _html_page(title, body):
+    return f"""<!DOCTYPE html>
+<html lang="ja">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <style>{ARCHIVE_CSS}</style>
+</head>
+<body>
+    <div class="container">
+{body}
+    </div>
+</body>
+</html>
+"""
+
+
+def day_filename(day):
+    return f"{day.isoformat()}.html"
+
+
+def page_filename(number):
+    return f"page-{number:04d}.html"
+
+
+def _day_label(day):
+    return f"{day.year}年{day.month:02d}月{day.day:02d}日"
+
+
+def render_day(day, articles, companies):
+    """1日分のページ（会社の並び順で、その日に初めて取得した記事）"""
+    by_company = {}
+    for company, item in articles:
+        by_company.setdefault(company, []).append(item)
+    order = {company: i for i, company in enumerate(companies)}
+    sections = []
+    for company in sorted(by_company, key=lambda c: (order.get(c, len(order)), c)):
+        items = "\n".join(
+            f"            <li><a href='{item.link_html}' target='_blank'>{item.title_html}</a>"
+            f"<div class='news-date'>{item.date_label}</div></li>"
+            for item in by_company[company]
+        )
+        sections.append(f"        <h2>{company}（{len(by_company[company])}件）</h2>\n        <ul>\n{items}\n        </ul>")
+    body = (f"        <h1>📰 {_day_label(day)} のニュース</h1>\n"
+            f"        <nav><a href='index.html'>📚 アーカイブ一覧</a><a href='../index.html'>🌟 最新のダイジェスト</a></nav>\n"
+            + "\n".join(sections))
+    return _html_page(f"11BP GFE NEWS DIGEST {_day_label(day)}", body)
+
+
+def render_listing(days, number, sealed_pages):
+    """一覧ページ（number が None なら最新の index.html）。日付は新しい順"""
+    links = [f"<a href='{page_filename(sealed_pages)}'>⬅️ それより前</a>"] if sealed_pages and number is None else []
+    if number is not None:
+        if number > 1:
+            links.append(f"<a href='{page_filename(number - 1)}'>⬅️ それより前</a>")
+        if number < sealed_pages:
+            links.append(f"<a href='{page_filename(number + 1)}'>➡️ それより後</a>")
+        links.append("<a href='index.html'>➡️ 最新のアーカイブ</a>")
+    links.append("<a href='../index.html'>🌟 最新のダイジェスト</a>")
+    items = "\n".join(
+        f"            <li><a href='{day_filename(day)}'>{_day_label(day)}</a></li>"
+        for day in reversed(days)
+    ) or "            <li class='empty'>まだありません</li>"
+    title = "アーカイブ" if number is None else f"アーカイブ（{days[0].isoformat()}〜{days[-1].isoformat()}）"
+    body = (f"        <h1>📚 {title}</h1>\n"
+            f"        <nav>{''.join(links)}</nav>\n"
+            f"        <ul>\n{items}\n        </ul>")
+    return _html_page(f"11BP GFE NEWS DIGEST {title}", body)
+
+
+def archived_days(archive_dir=ARCHIVE_DIR):
+    """書き出し済みの日付（古い順）"""
+    try:
+        names = os.listdir(archive_dir)
+    except FileNotFoundError:
+        return []
+    return sorted(date.fromisoformat(m.group(1)) for m in map(_DAY_FILE.match, names) if m)
+
+
+def update_archive(store, companies, today=None, archive_dir=ARCHIVE_DIR, filters=None):
+    """昨日までのうち、まだ書き出していない日のページを追加し、一覧を更新する。追加した日付のリストを返す
+
+    filters（会社名 → KeywordFilter）で除外される記事はページに載せない。書き出し済みの日のページは
+    作り直さないので、後から足したルールはそれ以降に書き出す日から反映される。
+    """
+    today = today or date.today()
+    filters = filters or {}
+    days = archived_days(archive_dir)
+    if days:
+        start = days[-1] + timedelta(days=1)
+    else:
+        first = store.first_fetched_at()
+        if first is None:
+            return []
+        start = max(datetime.fromtimestamp(first).date(), today - timedelta(days=BACKFILL_DAYS))
+
+    os.makedirs(archive_dir, exist_ok=True)
+    added = []
+    day = start
+    while day < today:
+        begin = datetime.combine(day, dtime()).timestamp()
+        end = datetime.combine(day + timedelta(days=1), dtime()).timestamp()
+        articles = [(company, item) for company, item in store.fetched_between(begin, end)
+                    if company not in filters or filters[company].keep(item.title)]
+        if articles:
+            write_atomic(os.path.join(archive_dir, day_filename(day)), render_day(day, articles, companies))
+            added.append(day)
+        day += timedelta(days=1)
+    if not added and os.path.exists(os.path.join(archive_dir, "index.html")):
+        return []
+
+    # 一覧：埋まったページは新しく埋まったものだけ書き、残りを index.html に出す
+    # （それまで最後だったページにも「それより後」のリンクを足すため書き直す）
+    days += added
+    sealed_pages = len(days) // PAGE_SIZE
+    previous_pages = (len(days) - len(added)) // PAGE_SIZE
+    first_page = max(previous_pages, 1) if sealed_pages > previous_pages else sealed_pages + 1
+    for number in range(first_page, sealed_pages + 1):
+        page_days = days[(number - 1) * PAGE_SIZE:number * PAGE_SIZE]
+        path = os.path.join(archive_dir, page_filename(number))
+        write_atomic(path, render_listing(page_days, number, sealed_pages))
+    write_atomic(os.path.join(archive_dir, "index.html"),
+           render_listing(days[sealed_pages * PAGE_SIZE:], None, sealed_pages))
+    return added
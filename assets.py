@@ -0,0 +1,64 @@
+"""CSS / JS の書き出し（最小化してファイル名に内容のハッシュを付ける）"""
+import glob
+import hashlib
+import os
+import re
+
+from fileio import write_atomic
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+ASSETS_DIR = "assets"
+
+_CSS_STRING = re.compile(r"""("[^"]*"|'[^']*')""")
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE = re.compile(r"\s+")
+_CSS_PUNCT = re.compile(r"\s*([{}:;,>])\s*")
+
+
+def minify_css(css):
+    """コメントと余分な空白を除く（文字列リテラルの中はそのまま）"""
+    parts = _CSS_STRING.split(_CSS_COMMENT.sub("", css))
+    for i in range(0, len(parts), 2):
+        parts[i] = _CSS_PUNCT.sub(r"\1", _CSS_SPACE.sub(" ", parts[i])).replace(";}", "}")
+    return "".join(parts).strip()
+
+
+def minify_js(js):
+    """行頭の空白・空行・行コメントだけを除く（改行は残すので自動セミコロン挿入に影響しない）"""
+    lines = (line.strip() for line in js.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith("//"))
+
+
+MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+def read_static(name):
+    with open(os.path.join(STATIC_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def build_asset(name, output_dir="."):
+    """static/ のファイルを最小化して assets/<名前>.<ハッシュ>.<拡張子> に書き出し、ページからの相対パスを返す
+
+    同じ内容なら同じファイル名になるので、既にあれば書き込まない。
+    """
+    stem, ext = os.path.splitext(name)
+    content = MINIFIERS[ext](read_static(name)).encode("utf-8")
+    digest = hashlib.sha256(content).hexdigest()[:12]
+    relative_path = f"{ASSETS_DIR}/{stem}.{digest}{ext}"
+    path = os.path.join(output_dir, relative_path)
+    if not os.path.exists(path):
+        write_atomic(path, content)
+        print(f"📦 {relative_path} を書き出しました（{len(content):,} bytes）")
+    return relative_path
+
+
+def prune_assets(keep, output_dir="."):
+    """keep 以外の古いハッシュ付きファイルを削除（新しいページを書き出した後に呼ぶ）"""
+    keep = {os.path.normpath(os.path.join(output_dir, path)) for path in keep}
+    for name in keep:
+        stem, ext = os.path.splitext(os.path.basename(name))
+        pattern = os.path.join(os.path.dirname(name), f"{stem.rsplit('.', 1)[0]}.*{ext}")
+        for path in glob.glob(pattern):
+            if os.path.normpath(path) not in keep:
+                os.remove(path)
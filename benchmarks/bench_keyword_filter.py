@@ -0,0 +1,53 @@
+"""キーワードフィルタのマイクロベンチマーク
+
+従来の any(kw in title for kw in keywords) と、1つの正規表現にまとめた
+KeywordFilter をルール数・記事数を変えて比較する。
+
+    python benchmarks/bench_keyword_filter.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from keyword_filter import KeywordFilter  # noqa: E402
+
+CHARS = "アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワン株決算発表新型提携開始"
+RULE_COUNTS = (60, 1000, 5000)
+ENTRY_COUNTS = (1000, 10000)
+
+
+def random_word(rng, low, high):
+    return "".join(rng.choice(CHARS) for _ in range(rng.randint(low, high)))
+
+
+def naive(keywords, titles):
+    return [t for t in titles if not any(kw in t for kw in keywords)]
+
+
+def measure(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'ルール数':>8} {'記事数':>8} {'コンパイル':>10} {'従来':>10} {'KeywordFilter':>14} {'倍率':>6}")
+    for rule_count in RULE_COUNTS:
+        keywords = [random_word(rng, 3, 6) for _ in range(rule_count)]
+        rules, compile_time = measure(lambda: KeywordFilter(keywords))
+        for entry_count in ENTRY_COUNTS:
+            titles = [random_word(rng, 30, 60) for _ in range(entry_count)]
+            expected, naive_time = measure(lambda: naive(keywords, titles))
+            actual, fast_time = measure(lambda: [t for t in titles if rules.keep(t)])
+            assert actual == expected, "結果が一致しません"
+            print(f"{rule_count:>8} {entry_count:>8} {compile_time * 1000:>8.1f}ms "
+                  f"{naive_time * 1000:>8.1f}ms {fast_time * 1000:>12.1f}ms "
+                  f"{naive_time / fast_time:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""ネットワークを使わない全体ベンチマーク
+
+ローカルの RSS サーバー（feed_server.py）に向けて main.py の各段階を順に実行し、
+段階ごとの所要時間を JSON に保存する。コミット間で結果を比べて性能の後退を見つける。
+
+    python benchmarks/bench_pipeline.py                       # 25 / 250 / 2500 ソース
+    python benchmarks/bench_pipeline.py --sizes 25 250 --latency 0.05 --error-rate 0.1
+    python benchmarks/bench_pipeline.py --compare benchmarks/results/<前回>.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, ".."))
+
+import main  # noqa: E402
+from dedup import dedupe  # noqa: E402
+from feed_server import FeedServer  # noqa: E402
+from fetcher import HostRateLimiter, download, fetch_all  # noqa: E402
+from fileio import write_atomic  # noqa: E402
+from planner import plan_queries, split_results  # noqa: E402
+from registry import Registry, make_company  # noqa: E402
+from store import ArticleStore  # noqa: E402
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+STAGES = ("fetch", "parse", "filter", "store", "dedup", "render", "write")
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class Timer:
+    """段階ごとの所要時間を記録する"""
+
+    def __init__(self):
+        self.stages = {}
+
+    def run(self, stage, func):
+        started = time.perf_counter()
+        result = func()
+        self.stages[stage] = round(time.perf_counter() - started, 4)
+        return result
+
+
+def run_pipeline(server, count, workers, rate, work_dir, parser=main.PARSER, batch_size=main.BATCH_SIZE,
+                 window_days=main.NEWS_WINDOW_DAYS):
+    """count 社ぶんのソースで1回分の処理を実行し、段階ごとの時間などを返す"""
+    registry = Registry(
+        make_company(f"ベンチ{i:05d}", url=server.url_for(f"ベンチ{i:05d}"), tab_id=f"bench{i:05d}")
+        for i in range(count)
+    )
+    main.REGISTRY = registry
+    sources = registry.sources()
+
+    # 全社に本番で最も大きいルール（ソフトバンク）を適用する
+    with open(main.FILTERS_PATH, encoding="utf-8") as f:
+        rules = json.load(f)["ソフトバンク"]
+    filters_path = os.path.join(work_dir, f"filters-{count}.json")
+    with open(filters_path, "w", encoding="utf-8") as f:
+        json.dump(dict.fromkeys(sources, rules), f, ensure_ascii=False)
+
+    timer = Timer()
+    rate_limiter = HostRateLimiter(rate, max(1, int(rate))) if rate else None
+
+    def fetch(company, url):
+        if rate_limiter:
+            rate_limiter.acquire(url)
+        try:
+            return download(url)
+        except OSError:
+            return None
+
+    plans = plan_queries(sources, batch_size, window_days)
+    responses = timer.run("fetch", lambda: fetch_all({plan.key: plan.url for plan in plans}, fetch, max_workers=workers))
+    ok = {key: r for key, r in responses.items() if r and r.status == 200}
+    results = timer.run("parse", lambda: split_results(
+        plans, {key: main.parse_feed(r, parser).entries for key, r in ok.items()}, sources))
+    filtered = timer.run("filter", lambda: {
+        company: main.filter_entries(company, entries, filters_path) for company, entries in results.items()})
+
+    def ingest():
+        store = ArticleStore(os.path.join(work_dir, f"news-{count}.db"))
+        since = time.time() - main.NEWS_WINDOW_DAYS * 24 * 3600
+        for company, entries in filtered.items():
+            store.upsert(company, entries)
+        data = {company: store.recent(company, since, main.MAX_ARTICLES) for company in sources}
+        store.close()
+        return data
+
+    companies_data = timer.run("store", ingest)
+    companies_data = timer.run("dedup", lambda: dedupe(companies_data))
+    total = sum(len(entries) for entries in companies_data.values())
+    fragments = timer.run("render", lambda: list(main.iter_page(companies_data, "", "", total, "", "")))
+    size = timer.run("write", lambda: write_atomic(os.path.join(work_dir, "index.html"), fragments))
+
+    return {
+        "sources": count,
+        "stages": timer.stages,
+        "total": round(sum(timer.stages.values()), 4),
+        "requests": len(plans),
+        "failed_requests": len(plans) - len(ok),
+        "bytes_received": sum(len(r.body) for r in ok.values()),
+        "entries_parsed": sum(len(entries) for entries in results.values()),
+        "articles_rendered": total,
+        "html_bytes": size,
+    }
+
+
+def print_result(result, baseline=None):
+    stages = " ".join(f"{stage}={result['stages'][stage]:.3f}s" for stage in STAGES)
+    print(f"  {result['sources']:>5} ソース: 合計 {result['total']:.3f}s | {stages}")
+    print(f"          リクエスト {result['requests']} 件、受信 {result['bytes_received']:,} bytes、"
+          f"記事 {result['entries_parsed']} 件")
+    if baseline:
+        diffs = []
+        for stage in STAGES + ("total",):
+            old = baseline["stages"].get(stage) if stage != "total" else baseline["total"]
+            new = result["stages"][stage] if stage != "total" else result["total"]
+            if old:
+                diffs.append(f"{stage} {new / old:.2f}x")
+        print(f"          前回比: {' | '.join(diffs)}")
+
+
+def main_bench(argv=None):
+    parser = argparse.ArgumentParser(description="ローカル RSS サーバーを使った全体ベンチマーク")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25, 250, 2500], help="ソース数")
+    parser.add_argument("--latency", type=float, default=0.02, help="サーバーの応答遅延（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 を返す割合（0〜1）")
+    parser.add_argument("--items", type=int, default=100, help="1フィードあたりの記事数")
+    parser.add_argument("--fixtures", help="記録済みフィード（*.xml）のディレクトリ（合成フィードの代わりに使う）")
+    parser.add_argument("--workers", type=int, default=main.MAX_WORKERS, help="同時に取得するフィード数")
+    parser.add_argument("--parser", choices=("fast", "feedparser"), default=main.PARSER, help="フィードのパーサー")
+    parser.add_argument("--batch-size", type=int, default=main.BATCH_SIZE, help="1リクエストにまとめる会社数")
+    parser.add_argument("--no-server-window", dest="server_window", action="store_false",
+                        help="検索語に when: を付けない")
+    parser.add_argument("--rate", type=float, default=0, help="1秒あたりのリクエスト数の上限（0 で無制限）")
+    parser.add_argument("--output", help="結果の保存先（既定: benchmarks/results/<コミット>.json）")
+    parser.add_argument("--compare", help="比較する前回の結果 JSON")
+    args = parser.parse_args(argv)
+
+    revision = git_revision()
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = {r["sources"]: r for r in json.load(f)["results"]}
+
+    print(f"🏁 ベンチマーク開始（{revision}、遅延 {args.latency}s、エラー率 {args.error_rate}、"
+          f"{args.items} 件/フィード、並列数 {args.workers}、パーサー {args.parser}）")
+    results = []
+    with FeedServer(latency=args.latency, error_rate=args.error_rate, items=args.items,
+                    fixtures_dir=args.fixtures) as server, tempfile.TemporaryDirectory() as work_dir:
+        for count in args.sizes:
+            result = run_pipeline(server, count, args.workers, args.rate, work_dir, args.parser, args.batch_size,
+                                  main.NEWS_WINDOW_DAYS if args.server_window else None)
+            results.append(result)
+            print_result(result, baseline.get(count))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{revision}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    report = {
+        "revision": revision,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"💾 結果を保存しました: {output}")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,64 @@
+"""会社数を増やしたときの負荷確認（レジストリの構築・検索とタブ・ページの生成）
+
+    python benchmarks/bench_registry.py [会社数 ...]   # 既定: 100 1000 10000
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import main  # noqa: E402
+from fileio import write_atomic  # noqa: E402
+from models import NewsItem  # noqa: E402
+from registry import Registry, make_company  # noqa: E402
+
+ARTICLES_PER_COMPANY = 10
+
+
+def synthetic_registry(count):
+    return Registry(
+        make_company(f"会社{i:05d}", tab_id=f"c{i:05d}", icon=f"{i % 100}", emoji="🏢",
+                     shortcut=str(i + 2) if i < 3 else "")
+        for i in range(count)
+    )
+
+
+def synthetic_data(registry):
+    published = int(time.time())
+    return {
+        company.name: [
+            NewsItem.create(f"{company.tab_id}/{n}", f"{company.name} のニュース {n}",
+                            f"https://example.com/{company.tab_id}/{n}", published - n)
+            for n in range(ARTICLES_PER_COMPANY)
+        ]
+        for company in registry
+    }
+
+
+def measure(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+def main_bench(counts):
+    print(f"{'会社数':>7} {'構築':>9} {'検索':>9} {'タブ生成':>9} {'ページ生成':>10} {'1社あたり':>10}")
+    for count in counts:
+        registry, build_time = measure(lambda: synthetic_registry(count))
+        main.REGISTRY = registry
+        names = [company.name for company in registry]
+        _, lookup_time = measure(lambda: [(main.get_tab_id(n), main.get_company_icon(n)) for n in names])
+        _, nav_time = measure(lambda: "".join(main.iter_tab_nav(names)))
+        data = synthetic_data(registry)
+        with tempfile.TemporaryDirectory() as output_dir:
+            path = os.path.join(output_dir, "index.html")
+            _, page_time = measure(lambda: write_atomic(path, main.iter_page(
+                data, "", "", count * ARTICLES_PER_COMPANY, "", "")))
+        print(f"{count:>7} {build_time * 1000:>7.1f}ms {lookup_time * 1000:>7.1f}ms "
+              f"{nav_time * 1000:>7.1f}ms {page_time * 1000:>8.1f}ms {page_time / count * 1e6:>8.1f}µs")
+
+
+if __name__ == "__main__":
+    main_bench([int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000])
@@ -0,0 +1,187 @@
+"""ベンチマーク用のローカル RSS サーバー（Google News の検索フィードの代わり）
+
+/rss/search?q=<検索語> に対して、記録済みのフィード（fixtures_dir の *.xml を順番に割り当て）か、
+検索語から決まる合成フィードを返す。応答の遅延・エラー率・記事数を指定できる。
+合成フィードは Google ニュースと同じく「A OR B」と「when:30d」を解釈し、最大 items 件を返す。
+
+    python benchmarks/feed_server.py --port 8765 --latency 0.05 --error-rate 0.1
+"""
+import argparse
+import glob
+import hashlib
+import http.server
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from urllib.parse import parse_qs, quote_plus, urlsplit
+from xml.sax.saxutils import escape
+
+WORDS = ("新サービス", "決算", "提携", "発表", "開始", "値上げ", "新製品", "調査", "増益", "買収", "導入", "拡大")
+WHEN = re.compile(r"\s*when:(\d+)d\b")
+
+
+def parse_search(query):
+    """検索語を（OR でつながれた語のリスト, when: の日数）に分ける"""
+    match = WHEN.search(query)
+    days = int(match.group(1)) if match else None
+    terms = [term.strip().strip("()") for term in WHEN.sub("", query).split(" OR ")]
+    return [term for term in terms if term], days
+
+
+def synthetic_items(term, items, now):
+    """1つの検索語の合成記事を (公開日時, <item> の XML) で返す（同じ検索語なら同じ並び）"""
+    rng = random.Random(hashlib.sha256(term.encode()).digest())
+    for n in range(items):
+        headline = "・".join(rng.choice(WORDS) for _ in range(rng.randint(3, 6)))
+        title = f"{term}、{headline}（{n}） - 媒体{rng.randint(1, 30)}"
+        link = f"https://news.google.com/rss/articles/{hashlib.sha1(f'{term}/{n}'.encode()).hexdigest()}?oc=5"
+        published = now - timedelta(hours=rng.randint(1, 24 * 60))
+        yield published, (
+            f'<item><title>{escape(title)}</title><link>{link}</link>'
+            f'<guid isPermaLink="false">{hashlib.md5(link.encode()).hexdigest()}</guid>'
+            f'<pubDate>{format_datetime(published)}</pubDate>'
+            f'<description>&lt;a href="{link}"&gt;{escape(title)}&lt;/a&gt;</description>'
+            f'<source url="https://example.com">媒体</source></item>'
+        )
+
+
+def synthetic_feed(query, items, now=None):
+    """検索語から決まる合成フィード（OR の各語の記事を交互に並べ、when: より古い記事は除く）"""
+    now = now or datetime.now(timezone.utc)
+    terms, days = parse_search(query)
+    generators = [synthetic_items(term, items, now) for term in terms or [query]]
+    merged = (item for group in zip(*generators) for item in group)
+    selected = [xml for published, xml in merged if days is None or now - published <= timedelta(days=days)]
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>',
+        '<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"><channel>',
+        f'<generator>NFE/5.0</generator><title>"{escape(query)}" - Google ニュース</title>',
+        '<link>https://news.google.com/search?q=x&amp;hl=ja&amp;gl=JP&amp;ceid=JP:ja</link>',
+        '<language>ja</language><webMaster>news-webmaster@google.com</webMaster>',
+        f'<lastBuildDate>{format_datetime(now)}</lastBuildDate>',
+        '<description>Google ニュース</description>',
+    ]
+    parts.extend(selected[:items])
+    parts.append("</channel></rss>")
+    return "".join(parts).encode("utf-8")
+
+
+class FeedServer:
+    """バックグラウンドのスレッドで動く RSS サーバー（with 文で起動・停止）"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0, items=100,
+                 fixtures_dir=None, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.items = items
+        self.fixtures = sorted(glob.glob(os.path.join(fixtures_dir, "*.xml"))) if fixtures_dir else []
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.feeds = {}
+        self.requests = 0
+        self.bytes_sent = 0
+        self.httpd = http.server.ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url_for(self, query):
+        return f"{self.base_url}/rss/search?q={quote_plus(query)}&hl=ja&gl=JP&ceid=JP:ja"
+
+    def feed(self, query):
+        with self.lock:
+            body = self.feeds.get(query)
+        if body is None:
+            if self.fixtures:
+                index = int(hashlib.sha256(query.encode()).hexdigest(), 16) % len(self.fixtures)
+                with open(self.fixtures[index], "rb") as f:
+                    body = f.read()
+            else:
+                body = synthetic_feed(query, self.items)
+            with self.lock:
+                self.feeds[query] = body
+        return body
+
+    def _handler(self):
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                with server.lock:
+                    server.requests += 1
+                    failed = server.rng.random() < server.error_rate
+                if failed:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                query = parse_qs(urlsplit(self.path).query).get("q", [""])[0]
+                body = server.feed(query)
+                etag = f'"{hashlib.md5(body).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/xml; charset=utf-8")
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with server.lock:
+                    server.bytes_sent += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ベンチマーク用のローカル RSS サーバー")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="応答までの遅延（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 を返す割合（0〜1）")
+    parser.add_argument("--items", type=int, default=100, help="合成フィードの記事数")
+    parser.add_argument("--fixtures", help="記録済みフィード（*.xml）のディレクトリ")
+    args = parser.parse_args()
+    server = FeedServer(args.host, args.port, args.latency, args.error_rate, args.items, args.fixtures)
+    print(f"📡 {server.base_url}/rss/search?q=... で待ち受け中（Ctrl+C で終了）")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""ソースごとのサーキットブレーカー（状態は実行をまたいで保存）"""
+import json
+import os
+import threading
+import time
+
+from feed_cache import CACHE_DIR
+from fileio import write_atomic
+
+BREAKER_PATH = os.path.join(CACHE_DIR, "breakers.json")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+STATE_LABELS = {
+    CLOSED: "🟢 closed",
+    OPEN: "🔴 open",
+    HALF_OPEN: "🟡 half-open",
+}
+
+
+class CircuitBreaker:
+    """連続して失敗したソースを一定時間スキップし、時間が経ったら1回だけ試す
+
+    - closed: 通常どおり取得
+    - open: failure_threshold 回連続で失敗したのでスキップ中
+    - half_open: クールダウンが明けたので1回だけ試行（成功で closed、失敗で open に戻る）
+    再び open になるたびにクールダウンを2倍にする（max_cooldown まで）。
+    """
+
+    def __init__(self, path=BREAKER_PATH, failure_threshold=3,
+                 cooldown=12 * 3600, max_cooldown=7 * 24 * 3600):
+        self.path = path
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.lock = threading.Lock()
+        self.data = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.data = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"⚠️  サーキットブレーカーの状態を読み込めません（リセットします）: {e}")
+
+    def _get(self, source):
+        return self.data.setdefault(source, {"state": CLOSED, "failures": 0})
+
+    def state(self, source):
+        with self.lock:
+            return self._get(source)["state"]
+
+    def failures(self, source):
+        """連続して失敗した回数"""
+        with self.lock:
+            return self._get(source)["failures"]
+
+    def allow(self, source):
+        """取得してよいかを返す（open のままなら False）"""
+        with self.lock:
+            record = self._get(source)
+            if record["state"] == OPEN:
+                if time.time() < record["opened_at"] + record["cooldown"]:
+                    return False
+                record["state"] = HALF_OPEN
+            return True
+
+    def record_success(self, source):
+        with self.lock:
+            self.data[source] = {"state": CLOSED, "failures": 0}
+
+    def record_failure(self, source):
+        with self.lock:
+            record = self._get(source)
+            record["failures"] += 1
+            if record["state"] == HALF_OPEN:
+                cooldown = min(record.get("cooldown", self.cooldown) * 2, self.max_cooldown)
+            elif record["failures"] >= self.failure_threshold:
+                cooldown = self.cooldown
+            else:
+                return
+            record.update(state=OPEN, opened_at=time.time(), cooldown=cooldown)
+
+    def summary(self, sources):
+        """sources の状態を (名前, 状態, 連続失敗回数) のリストで返す"""
+        with self.lock:
+            return [(source, self._get(source)["state"], self._get(source)["failures"])
+                    for source in sources]
+
+    def save(self):
+        with self.lock:
+            payload = json.dumps(self.data, ensure_ascii=False, indent=1)
+        write_atomic(self.path, payload)
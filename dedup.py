@@ -0,0 +1,92 @@
+"""ほぼ同じ記事の重複排除（タイトルの SimHash と LSH バケット）
+
+Google News の検索結果には、同じ配信記事が媒体違いや関連企業（PayPay とソフトバンク、
+電通と博報堂など）の検索でも繰り返し出てくる。タイトルを正規化して 64 ビットの
+SimHash を取り、ハミング距離が近いものを同じ記事とみなして1件だけ残す。
+"""
+import hashlib
+import re
+
+from keyword_filter import normalize
+
+HASH_BITS = 64
+MAX_DISTANCE = 3   # このビット数以内の違いなら同じ記事とみなす
+SHINGLE_SIZE = 3
+
+_SOURCE_SUFFIX = re.compile(r"\s+-\s+[^-]+$")
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_title(title):
+    """末尾の「 - 媒体名」と記号・空白を除いて正規化"""
+    return _NON_WORD.sub("", normalize(_SOURCE_SUFFIX.sub("", title)))
+
+
+def simhash(text):
+    """文字 n-gram の SimHash（64 ビット）"""
+    shingles = {text[i:i + SHINGLE_SIZE] for i in range(max(1, len(text) - SHINGLE_SIZE + 1))}
+    weights = [0] * HASH_BITS
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for bit in range(HASH_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(HASH_BITS) if weights[bit] > 0)
+
+
+class SimHashIndex:
+    """ハミング距離 max_distance 以内の SimHash を探す LSH インデックス
+
+    ハッシュを max_distance + 1 個の帯に分けると、距離が max_distance 以内なら
+    少なくとも1つの帯は完全に一致する（鳩の巣原理）。帯ごとのバケットに入った候補だけを比べる。
+    """
+
+    def __init__(self, max_distance=MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = -(-HASH_BITS // self.bands)
+        self.buckets = {}
+
+    def _keys(self, value):
+        mask = (1 << self.band_bits) - 1
+        return [(band, value >> (band * self.band_bits) & mask) for band in range(self.bands)]
+
+    def find(self, value):
+        """近いハッシュが登録済みなら True"""
+        for key in self._keys(value):
+            for other in self.buckets.get(key, ()):
+                if (value ^ other).bit_count() <= self.max_distance:
+                    return True
+        return False
+
+    def add(self, value):
+        for key in self._keys(value):
+            self.buckets.setdefault(key, []).append(value)
+
+
+def _rank(company, entry, order):
+    """残す記事の優先順位（タイトルに会社名を含むもの → 新しいもの → 会社の並び順）"""
+    return (normalize(company) not in normalize(entry.title), entry.sort_key, order)
+
+
+def dedupe(companies_data, max_distance=MAX_DISTANCE):
+    """会社をまたいで重複している記事（NewsItem）を除き、各社の記事の並びはそのまま返す"""
+    candidates = [
+        (_rank(company, entry, order), company, id(entry), entry)
+        for order, (company, entries) in enumerate(companies_data.items())
+        for entry in entries
+    ]
+    candidates.sort(key=lambda c: c[0])
+
+    index = SimHashIndex(max_distance)
+    kept = set()
+    for _, company, key, entry in candidates:
+        fingerprint = simhash(normalize_title(entry.title))
+        if index.find(fingerprint):
+            continue
+        index.add(fingerprint)
+        kept.add(key)
+
+    return {
+        company: [entry for entry in entries if id(entry) in kept]
+        for company, entries in companies_data.items()
+    }
@@ -0,0 +1,173 @@
+"""生成したダイジェストをメモリに載せて配信する HTTP サーバー
+
+ファイルは生成のたびに読み込み、gzip（と brotli があれば br）を事前に圧縮しておく。
+リクエストごとに圧縮し直さず、強い ETag と 304 で応答する。
+新しい内容は全ファイルを読み込んで圧縮し終えてから、辞書ごと差し替える（配信中の応答は古い内容のまま完結する）。
+"""
+import gzip
+import hashlib
+import http.server
+import mimetypes
+import os
+import threading
+
+try:
+    import brotli
+except ImportError:  # brotli は任意（なければ gzip だけ）
+    brotli = None
+
+HOST = "127.0.0.1"
+PORT = 8000
+MIN_COMPRESS_SIZE = 512     # これより小さいファイルは圧縮しない
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+IMMUTABLE_DIRS = ("assets/",)   # 内容のハッシュ付きのファイル名なので長くキャッシュさせてよい
+
+
+class Resource:
+    """1ファイル分の応答（非圧縮と事前に圧縮した本文、符号化ごとの強い ETag）"""
+
+    __slots__ = ("digest", "content_type", "cache_control", "bodies", "etags")
+
+    def __init__(self, path, body, digest=None):
+        self.digest = digest or hashlib.sha256(body).hexdigest()
+        content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type.endswith(("javascript", "json")):
+            content_type += "; charset=utf-8"
+        self.content_type = content_type
+        self.cache_control = ("public, max-age=31536000, immutable" if path.startswith(IMMUTABLE_DIRS)
+                              else "no-cache")
+        self.bodies = {"identity": body}
+        if len(body) >= MIN_COMPRESS_SIZE and content_type.startswith(COMPRESSIBLE_TYPES):
+            self.bodies["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli:
+                self.bodies["br"] = brotli.compress(body, quality=11)
+        tag = self.digest[:20]
+        self.etags = {
+            encoding: f'"{tag}"' if encoding == "identity" else f'"{tag}-{encoding}"'
+            for encoding in self.bodies
+        }
+
+    def negotiate(self, accept_encoding):
+        """Accept-Encoding から返す符号化を選ぶ（br → gzip → 非圧縮）"""
+        accepted = set()
+        for part in (accept_encoding or "").split(","):
+            coding, _, params = part.partition(";")
+            name, _, value = params.partition("=")
+            try:
+                if name.strip() == "q" and float(value) == 0:
+                    continue   # q=0 は「使わない」
+            except ValueError:
+                pass
+            accepted.add(coding.strip().lower())
+        for encoding in ("br", "gzip"):
+            if encoding in self.bodies and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+
+def load_site(root, paths, previous=None):
+    """root からの相対パス（ファイルかディレクトリ）を読み込み、URL パス → Resource にする
+
+    previous（前回の load_site の結果）と内容が同じファイルは圧縮し直さずに使い回す。
+    """
+    previous = previous or {}
+    resources = {}
+    for path in paths:
+        full = os.path.join(root, path)
+        if os.path.isdir(full):
+            files = [os.path.relpath(os.path.join(d, name), root)
+                     for d, _, names in os.walk(full) for name in names]
+        elif os.path.isfile(full):
+            files = [path]
+        else:
+            continue
+        for name in files:
+            url_path = name.replace(os.sep, "/")
+            with open(os.path.join(root, name), "rb") as f:
+                body = f.read()
+            digest = hashlib.sha256(body).hexdigest()
+            old = previous.get("/" + url_path)
+            resources["/" + url_path] = old if old and old.digest == digest else Resource(url_path, body, digest)
+    if "/index.html" in resources:
+        resources["/"] = resources["/index.html"]
+    return resources
+
+
+class DigestServer:
+    """メモリ上のファイルを配信する HTTP サーバー（publish で内容を丸ごと差し替える）"""
+
+    def __init__(self, host=HOST, port=PORT):
+        self.resources = {}
+        self.httpd = http.server.ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def publish(self, resources):
+        """新しい内容に差し替える（参照の付け替えだけなので、配信中のリクエストは古い内容で完結する）"""
+        self.resources = resources
+
+    def publish_site(self, root, paths):
+        resources = load_site(root, paths, self.resources)
+        self.publish(resources)
+        return resources
+
+    def _handler(self):
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            server_version = "NewsDigest"
+
+            def _respond(self, head_only):
+                path = self.path.split("?", 1)[0].split("#", 1)[0]
+                resource = server.resources.get(path)
+                if resource is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                encoding = resource.negotiate(self.headers.get("Accept-Encoding"))
+                etag = resource.etags[encoding]
+                if_none_match = self.headers.get("If-None-Match", "")
+                not_modified = if_none_match.strip() == "*" or etag in (
+                    tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+                body = b"" if not_modified else resource.bodies[encoding]
+
+                self.send_response(304 if not_modified else 200)
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", resource.cache_control)
+                if len(resource.bodies) > 1:
+                    self.send_header("Vary", "Accept-Encoding")
+                if not not_modified:
+                    self.send_header("Content-Type", resource.content_type)
+                    if encoding != "identity":
+                        self.send_header("Content-Encoding", encoding)
+                    self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if not head_only:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._respond(head_only=False)
+
+            def do_HEAD(self):
+                self._respond(head_only=True)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
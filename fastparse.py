@@ -0,0 +1,81 @@
+"""Google ニュースの RSS 2.0 専用の軽量パーサー（必要な項目だけを逐次パースする）
+
+feedparser は全項目の解析とサニタイズを行うため重い。Google ニュースのフィードは
+<rss version="2.0"><channel><item> の形で、必要なのは title / link / pubDate / guid だけなので、
+xml.etree.ElementTree.iterparse で1件ずつ読み、読み終えた要素はすぐに捨てる。
+想定と違う形のフィードなら None を返し、呼び出し側で feedparser に切り替える。
+"""
+import calendar
+import io
+import time
+import xml.etree.ElementTree as ET
+from email.utils import mktime_tz, parsedate_tz
+
+import feedparser
+
+
+class UnexpectedFeed(Exception):
+    """想定している RSS 2.0 の形ではない"""
+
+
+def parse_pubdate(text):
+    """RFC 822 形式の日時を UTC の struct_time に変換（解釈できなければ None）"""
+    parsed = parsedate_tz(text) if text else None
+    if parsed is None:
+        return None
+    return time.gmtime(mktime_tz(parsed))
+
+
+def iter_items(body, since=None):
+    """フィードの記事を (guid, title, link, published_parsed) で順に返す
+
+    since（UNIX 時刻）より古い記事は飛ばす。形が想定と違えば UnexpectedFeed を送出する。
+    """
+    events = ET.iterparse(io.BytesIO(body), events=("start", "end"))
+    _, root = next(events)
+    if root.tag != "rss" or not root.get("version", "").startswith("2."):
+        raise UnexpectedFeed(f"ルート要素が RSS 2.0 ではありません: <{root.tag}>")
+
+    depth = 0
+    channel = None
+    for event, elem in events:
+        if event == "start":
+            depth += 1
+            if depth == 1 and elem.tag == "channel":
+                channel = elem
+            continue
+        depth -= 1
+        # depth は閉じた要素の親の深さ（<channel> 直下の要素なら 1）
+        if depth != 1 or elem.tag != "item" or channel is None:
+            if depth == 1:
+                elem.clear()
+            continue
+
+        title = elem.findtext("title")
+        link = elem.findtext("link")
+        if title is None or not link:
+            raise UnexpectedFeed("title / link のない記事があります")
+        published = parse_pubdate(elem.findtext("pubDate"))
+        guid = elem.findtext("guid") or link
+        # 読み終えた記事は捨てる（フィード全体を木として持たない）
+        del channel[:]
+
+        if published is None or (since is not None and calendar.timegm(published) < since):
+            continue
+        yield guid.strip(), title.strip(), link.strip(), published
+
+
+def parse(body, since=None, limit=None):
+    """記事を feedparser と同じ形（entries の各要素が id / title / link / published_parsed）で返す
+
+    limit 件を読んだ時点で打ち切る。想定外の形や壊れた XML なら None を返す。
+    """
+    entries = []
+    try:
+        for guid, title, link, published in iter_items(body, since):
+            entries.append(feedparser.FeedParserDict(id=guid, title=title, link=link, published_parsed=published))
+            if limit and len(entries) >= limit:
+                break
+    except (ET.ParseError, UnexpectedFeed, StopIteration):
+        return None
+    return feedparser.FeedParserDict(entries=entries, version="rss20", bozo=0)
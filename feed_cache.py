@@ -0,0 +1,74 @@
+"""フィードの条件付き取得用キャッシュ（ETag / Last-Modified）"""
+import json
+import os
+import threading
+import time
+
+import feedparser
+
+from fileio import write_atomic
+
+CACHE_DIR = ".cache"
+FEED_CACHE_PATH = os.path.join(CACHE_DIR, "feeds.json")
+
+# キャッシュに残すエントリの項目（描画とフィルタに必要なものだけ）
+ENTRY_FIELDS = ("id", "title", "link")
+
+
+def _dump_entry(entry):
+    data = {field: entry[field] for field in ENTRY_FIELDS if field in entry}
+    if entry.get("published_parsed"):
+        data["published_parsed"] = list(entry.published_parsed)
+    return data
+
+
+def _load_entry(data):
+    entry = feedparser.FeedParserDict(data)
+    if "published_parsed" in data:
+        entry["published_parsed"] = time.struct_time(data["published_parsed"])
+    return entry
+
+
+class FeedCache:
+    """URL ごとに ETag・Last-Modified と前回パースしたエントリを保存する"""
+
+    def __init__(self, path=FEED_CACHE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.data = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.data = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"⚠️  フィードキャッシュを読み込めません（作り直します）: {e}")
+
+    def validators(self, url):
+        """条件付き GET 用の etag / modified を返す"""
+        with self.lock:
+            cached = self.data.get(url, {})
+        return cached.get("etag"), cached.get("modified")
+
+    def entries(self, url):
+        """前回パースしたエントリを返す（キャッシュがなければ None）"""
+        with self.lock:
+            cached = self.data.get(url)
+        if cached is None:
+            return None
+        return [_load_entry(e) for e in cached["entries"]]
+
+    def store(self, url, entries, etag=None, modified=None):
+        """取得に成功したフィードのエントリと ETag / Last-Modified を保存"""
+        with self.lock:
+            self.data[url] = {
+                "etag": etag,
+                "modified": modified,
+                "entries": [_dump_entry(e) for e in entries],
+            }
+
+    def save(self):
+        """キャッシュをファイルに書き出す"""
+        with self.lock:
+            payload = json.dumps(self.data, ensure_ascii=False)
+        write_atomic(self.path, payload)
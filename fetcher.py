@@ -0,0 +1,189 @@
+"""フィード取得エンジン（並列取得とホスト単位のレート制限）"""
+import http.cookiejar
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+import feedparser
+import requests
+from requests.adapters import HTTPAdapter
+
+CONNECT_TIMEOUT = 5.0    # 接続（TLS のハンドシェイクを含む）のタイムアウト（秒）
+READ_TIMEOUT = 20.0      # 応答を待つ・本文を読むときに、データが届かない時間の上限（秒）
+READ_CHUNK = 64 * 1024
+
+# status: HTTP ステータス、headers: 小文字のヘッダー名 → 値、body: 本文のバイト列（圧縮は展開済み）
+Response = namedtuple("Response", ["status", "headers", "body"])
+
+
+def new_session(pool_size=8):
+    """フィードの取得に使う HTTP セッション（ホストごとに keep-alive の接続をプールして使い回す）
+
+    pool_size は1ホストあたりに残しておく接続数（並列数に合わせる）。
+    Accept-Encoding は requests が付ける（gzip / deflate、brotli があれば br も）。クッキーは送らない。
+    """
+    session = requests.Session()
+    session.headers["User-Agent"] = feedparser.USER_AGENT
+    session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def connection_stats(session):
+    """セッションでこれまでに送ったリクエスト数と、そのために張った接続数を返す"""
+    requests_sent = connections = 0
+    adapters = {id(adapter): adapter for adapter in session.adapters.values()}   # http / https で同じアダプター
+    for adapter in adapters.values():
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                requests_sent += pool.num_requests
+                connections += pool.num_connections
+    return requests_sent, connections
+
+
+_default_session = None
+_default_session_lock = threading.Lock()
+
+
+def _get_default_session():
+    global _default_session
+    with _default_session_lock:
+        if _default_session is None:
+            _default_session = new_session()
+        return _default_session
+
+
+def download(url, etag=None, modified=None, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), deadline=None, session=None):
+    """フィードの本文をダウンロードする（etag / modified を渡すと条件付き GET）
+
+    session（new_session()）の接続を使い回す。省略するとモジュール共通のセッションを使う。
+    timeout は (接続, 読み込み) の秒数。deadline（time.monotonic() の値）を渡すと、
+    それを過ぎても本文を読み終わらない場合は少しずつ届いていても打ち切る。
+    HTTP エラーも例外にせず Response で返す。接続できない・時間切れの場合は requests の例外や TimeoutError を送出する。
+    """
+    connect_timeout, read_timeout = timeout
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("実行の期限を過ぎました")
+        connect_timeout, read_timeout = min(connect_timeout, remaining), min(read_timeout, remaining)
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if modified:
+        headers["If-Modified-Since"] = modified
+    session = session or _get_default_session()
+    with session.get(url, headers=headers, timeout=(connect_timeout, read_timeout), stream=True) as response:
+        return Response(response.status_code, _headers(response.headers), _read(response, deadline))
+
+
+def _read(response, deadline):
+    """本文を読み切る（読み終えた接続はプールに戻る）"""
+    if deadline is None:
+        return response.content
+    raw = response.raw
+    read = getattr(raw, "read1", raw.read)   # read() は READ_CHUNK 分が揃うまで戻らない（read1 は urllib3 2 以降）
+    chunks = []
+    while chunk := read(READ_CHUNK, decode_content=True):
+        chunks.append(chunk)
+        if time.monotonic() > deadline:
+            raise TimeoutError("実行の期限までに本文を読み終わりませんでした")
+    return b"".join(chunks)
+
+
+def _headers(message):
+    return {name.lower(): value for name, value in message.items()}
+
+
+class TokenBucket:
+    """トークンバケット方式のレート制限（rate 件/秒、最大 burst 件まで連続可）"""
+
+    def __init__(self, rate, burst):
+        if rate <= 0:
+            raise ValueError(f"rate は正の数にしてください: {rate}")
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """トークンを1つ取得する（不足していれば補充されるまで待機）"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class Backoff:
+    """ジッター付き指数バックオフ（base * 2^attempt を上限 cap として 0〜その値の間で待つ）"""
+
+    def __init__(self, base=1.0, cap=30.0):
+        self.base = base
+        self.cap = cap
+
+    def delay(self, attempt):
+        return random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+
+    def sleep(self, attempt, deadline=None):
+        """再試行の前に待つ（deadline を渡すと、それより後までは待たない）"""
+        delay = self.delay(attempt)
+        if deadline is not None:
+            delay = min(delay, max(0.0, deadline - time.monotonic()))
+        time.sleep(delay)
+
+
+class HostRateLimiter:
+    """ホストごとにトークンバケットを持つレート制限"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, url):
+        host = urlsplit(url).hostname or ""
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.rate, self.burst)
+        bucket.acquire()
+
+
+def fetch_all(sources, fetch, max_workers=8, deadline=None):
+    """sources（名前 → URL）を並列に取得し、元の順番のまま結果を返す
+
+    fetch(name, url) はワーカースレッドから呼ばれる。
+    レート制限は fetch 側で HostRateLimiter.acquire() を呼んで行う。
+    deadline（time.monotonic() の値）までに終わらなかったソースは待たずに結果から除く
+    （始まっていないものは取り消す。実行中のものは fetch 側で deadline を見て打ち切る）。
+    """
+    if max_workers <= 1:
+        results = {}
+        for name, url in sources.items():
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            results[name] = fetch(name, url)
+        return results
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+    try:
+        futures = {name: executor.submit(fetch, name, url) for name, url in sources.items()}
+        wait(futures.values(), timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return {name: future.result() for name, future in futures.items() if future.done() and not future.cancelled()}
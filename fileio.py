@@ -0,0 +1,28 @@
+"""ファイルの書き出し（一時ファイルに書き終えてからリネームで置き換え、書きかけのファイルを見せない）"""
+import os
+import tempfile
+
+
+def write_atomic(path, content):
+    """content（str・bytes、または str の断片を順に返す iterable）を path に書き出し、ファイルサイズを返す
+
+    一時ファイルは mkstemp で同じディレクトリに毎回別の名前で作る（daemon と cron の実行が重なっても
+    互いの一時ファイルを上書きしない）。途中で失敗したら一時ファイルは消す。
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=directory)
+    try:
+        if isinstance(content, bytes):
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+        else:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for fragment in [content] if isinstance(content, str) else content:
+                    f.write(fragment)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return os.path.getsize(path)
@@ -0,0 +1,76 @@
+"""会社ごとのキーワードフィルタ（除外・必須キーワードを1つの正規表現にまとめて判定）"""
+import functools
+import json
+import os
+import re
+import unicodedata
+
+FILTERS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "filters.json")
+
+
+def normalize(text):
+    """NFKC 正規化と大文字小文字の統一（「１軍」と「1軍」、「ＦＡ権」と「FA権」を同一視）"""
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+def _trie_pattern(node):
+    """トライ木を正規表現に変換（共通の接頭辞をまとめて分岐を減らす）"""
+    alternatives = []
+    for char in sorted(node):
+        child = node[char]
+        alternatives.append(re.escape(char) + (_trie_pattern(child) if child else ""))
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return "(?:" + "|".join(alternatives) + ")"
+
+
+def compile_keywords(keywords):
+    """キーワードのどれかを含むかを1回の走査で判定する正規表現を作る（キーワードがなければ None）"""
+    trie = {}
+    for keyword in sorted({normalize(k) for k in keywords if k}, key=len):
+        node = trie
+        for char in keyword:
+            if node.get(char) == {}:
+                break
+            node = node.setdefault(char, {})
+        else:
+            # 「含む」判定なので、短いキーワードを接頭辞に持つ長いキーワードは不要
+            node.clear()
+    if not trie:
+        return None
+    return re.compile(_trie_pattern(trie))
+
+
+class KeywordFilter:
+    """除外キーワードを含む記事を落とし、必須キーワードがあればそれを含む記事だけ残す"""
+
+    __slots__ = ("exclude", "include")
+
+    def __init__(self, exclude=(), include=()):
+        self.exclude = compile_keywords(exclude)
+        self.include = compile_keywords(include)
+
+    def keep(self, title):
+        title = normalize(title)
+        if self.exclude and self.exclude.search(title):
+            return False
+        if self.include and not self.include.search(title):
+            return False
+        return True
+
+    def apply(self, entries):
+        return [entry for entry in entries if self.keep(getattr(entry, "title", ""))]
+
+
+@functools.lru_cache(maxsize=None)
+def load_filters(path=FILTERS_PATH):
+    """設定ファイルを読み込み、会社ごとの KeywordFilter を返す（パスごとに1回だけコンパイル）"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        return {}
+    return {
+        company: KeywordFilter(rules.get("exclude", ()), rules.get("include", ()))
+        for company, rules in config.items()
+    }
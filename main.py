@@ -1,238 +1,289 @@
 import feedparser
 from datetime import datetime
+from functools import partial
+import argparse
+import hashlib
+import json
+import os
+from operator import attrgetter
+import re
 import time
 import random
-
-# RSS ソースの定義（順番を調整、博報堂とサイバーエージェントを追加）
-rss_sources = {
-    "ソフトバンク": "https://news.google.com/rss/search?q=ソフトバンク&hl=ja&gl=JP&ceid=JP:ja",
-    "大正製薬": "https://news.google.com/rss/search?q=大正製薬&hl=ja&gl=JP&ceid=JP:ja",
-    "SBI証券": "https://news.google.com/rss/search?q=SBI証券&hl=ja&gl=JP&ceid=JP:ja",
-    "ガンホー": "https://news.google.com/rss/search?q=ガンホー&hl=ja&gl=JP&ceid=JP:ja",
-    "GO": "https://news.google.com/rss/search?q=GO+タクシー&hl=ja&gl=JP&ceid=JP:ja",
-    "森ビル": "https://news.google.com/rss/search?q=森ビル&hl=ja&gl=JP&ceid=JP:ja",
-    "Spotify": "https://news.google.com/rss/search?q=スポティファイ&hl=ja&gl=JP&ceid=JP:ja",
-    "Epic Games": "https://news.google.com/rss/search?q=フォートナイト&hl=ja&gl=JP&ceid=JP:ja",
-    "富士電機": "https://news.google.com/rss/search?q=富士電機&hl=ja&gl=JP&ceid=JP:ja",
-    "ZOZO": "https://news.google.com/rss/search?q=ZOZO&hl=ja&gl=JP&ceid=JP:ja",
-    "えがお": "https://news.google.com/rss/search?q=株式会社えがお&hl=ja&gl=JP&ceid=JP:ja",
-    "芝浦機械": "https://news.google.com/rss/search?q=芝浦機械&hl=ja&gl=JP&ceid=JP:ja",
-    "M&Aキャピタル": "https://news.google.com/rss/search?q=M%26A%E3%82%AD%E3%83%A3%E3%83%94%E3%82%BF%E3%83%AB%E3%83%91%E3%83%BC%E3%83%88%E3%83%8A%E3%83%BC%E3%82%BA&hl=ja&gl=JP&ceid=JP:ja",
-    "エアウィーヴ": "https://news.google.com/rss/search?q=エアウィーヴ&hl=ja&gl=JP&ceid=JP:ja",
-    "PayPay": "https://news.google.com/rss/search?q=PayPay&hl=ja&gl=JP&ceid=JP:ja",
-    "アスクル": "https://news.google.com/rss/search?q=アスクル&hl=ja&gl=JP&ceid=JP:ja",
-    "UCC上島珈琲": "https://news.google.com/rss/search?q=UCC%E4%B8%8A%E5%B3%B6%E7%8F%88%E7%90%B2&hl=ja&gl=JP&ceid=JP:ja",
-    "TikTok": "https://news.google.com/rss/search?q=TikTok&hl=ja&gl=JP&ceid=JP:ja",
-    "ispace": "https://news.google.com/rss/search?q=ispace&hl=ja&gl=JP&ceid=JP:ja",
-    "プレミアグループ": "https://news.google.com/rss/search?q=プレミアグループ&hl=ja&gl=JP&ceid=JP:ja",
-    "TENTIAL": "https://news.google.com/rss/search?q=TENTIAL&hl=ja&gl=JP&ceid=JP:ja",
-    "サイボウズ": "https://news.google.com/rss/search?q=サイボウズ&hl=ja&gl=JP&ceid=JP:ja",
-    "電通": "https://news.google.com/rss/search?q=電通&hl=ja&gl=JP&ceid=JP:ja",
-    "博報堂": "https://news.google.com/rss/search?q=博報堂&hl=ja&gl=JP&ceid=JP:ja",
-    "サイバーエージェント": "https://news.google.com/rss/search?q=サイバーエージェント&hl=ja&gl=JP&ceid=JP:ja"
+import signal
+import threading
+
+from archive import ARCHIVE_DIR, update_archive
+from assets import ASSETS_DIR, build_asset, prune_assets, read_static
+from breaker import BREAKER_PATH, CLOSED, HALF_OPEN, STATE_LABELS, CircuitBreaker
+from dedup import MAX_DISTANCE, dedupe
+from digest_server import HOST, PORT, DigestServer
+import fastparse
+from feed_cache import FEED_CACHE_PATH, FeedCache
+from fetcher import (CONNECT_TIMEOUT, READ_TIMEOUT, Backoff, HostRateLimiter, connection_stats, download, fetch_all,
+                     new_session)
+from fileio import write_atomic
+from keyword_filter import FILTERS_PATH, load_filters
+from metrics import PROMETHEUS_PATH, REPORT_PATH, RunMetrics, SourceStats
+from planner import plan_queries, split_results
+from registry import load_registry
+from scheduler import MAX_INTERVAL, MIN_INTERVAL, SCHEDULE_PATH, PollSchedule
+from search_index import SEARCH_INDEX_PATH, update_search_index
+from snapshot import SnapshotRecorder, SnapshotReplay
+from store import STORE_PATH, ArticleStore
+
+# 並列取得の設定（すべて news.google.com 宛てなのでホスト単位で制限する）
+MAX_WORKERS = 8          # 同時に取得するフィード数
+RATE_LIMIT = 2.0         # 1ホストあたりの1秒間のリクエスト数
+RATE_LIMIT_BURST = 4     # 連続で送ってよいリクエスト数
+
+# リトライとサーキットブレーカーの設定
+MAX_RETRIES = 3               # 1ソースあたりの最大試行回数
+RETRY_BASE_DELAY = 1.0        # バックオフの初期値（秒）
+RETRY_MAX_DELAY = 30.0        # バックオフの上限（秒）
+BREAKER_THRESHOLD = 3         # この回数の実行で連続失敗したらスキップ
+BREAKER_COOLDOWN = 12 * 3600  # スキップしてから再試行するまでの時間（秒、失敗のたびに2倍）
+
+# 1回の取得全体の期限（秒）。過ぎたら残りのソースを打ち切り、取得できた分でページを生成する
+DEADLINE = 5 * 60
+
+# 取得できなかったソースは、ストアにある前回までの記事を取得した日時を添えて表示する（status → 理由）
+STALE_REASONS = {
+    "late": "⏱ 時間内に取得できなかったため",
+    "failed": "⚠️ 取得に失敗したため",
+    "skipped": "⏭ 失敗が続いて取得を休止しているため",
 }
+# 前回失敗したソースは前回までの記事を出せるので、再試行せず短い読み込みタイムアウトで1回だけ取り直す
+FLAKY_READ_TIMEOUT = 5.0
+
+# 出力
+RENDER_MODE = "single"  # single: セクションを1回だけ出力してタブで絞り込む / tabs: 個別企業タブにも出力
+                        # shards: 会社ごとの JSON を書き出し、タブを開いたときに読み込む
+SHARDS_DIR = "data"     # shards の JSON の出力先
+
+# serve で配信するファイル（ファイルかディレクトリ）
+SITE_PATHS = ("index.html", ASSETS_DIR, SHARDS_DIR)
+
+# 表示する記事
+NEWS_WINDOW_DAYS = 30   # この日数以内の記事を表示
+MAX_ARTICLES = 10       # 1社あたりの最大件数
+
+# フィードのパーサー（fast は Google ニュースの RSS 専用の軽量パーサー、feedparser は汎用）
+PARSER = "fast"
+PARSE_LIMIT = 0         # 1フィードから読む記事数の上限（0 は全件）
+
+# 取得計画（1リクエストにまとめる会社数。1 なら会社ごとに取得）
+BATCH_SIZE = 1
+
+# 会社の一覧（companies.json の並び順がタブの並び順。アイコン・タブ ID・ショートカットもここから作る）
+REGISTRY = load_registry()
+rss_sources = REGISTRY.sources()
 
 
 from datetime import datetime, timedelta
 
-def get_news_for_company(company, url, max_retries=3):
-    """特定の会社のニュースを取得する関数（1か月以内、最大10件まで）"""
-    one_month_ago = datetime.now() - timedelta(days=30)
+def parse_feed(response, parser=PARSER, since=None, limit=PARSE_LIMIT):
+    """ダウンロードしたフィードをパース（fast なら軽量パーサーを使い、想定外の形なら feedparser に切り替える）"""
+    if parser == "fast":
+        feed = fastparse.parse(response.body, since=since, limit=limit)
+        if feed is not None:
+            return feed
+    return feedparser.parse(response.body, response_headers=response.headers)
+
+def get_news_for_company(company, url, max_retries=MAX_RETRIES, rate_limiter=None, cache=None,
+                         breaker=None, backoff=None, metrics=None, parser=PARSER, parse_limit=PARSE_LIMIT,
+                         download=download, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), deadline=None):
+    """特定の会社のニュースを取得する関数（期間と件数の絞り込みは ArticleStore.recent() で行う）
+
+    download は fetcher.download() と同じ呼び出し方の関数（--record / --replay で差し替える）。
+    deadline（time.monotonic() の値）を過ぎたら再試行せずに打ち切る（status は late）。
+    """
+    etag, modified = cache.validators(url) if cache else (None, None)
+    backoff = backoff or Backoff(RETRY_BASE_DELAY, RETRY_MAX_DELAY)
+    stats = metrics.source(company) if metrics else SourceStats(company)
+
+    # 失敗が続いているソースはスキップし、クールダウン明けに1回だけ試す
+    if breaker:
+        if not breaker.allow(company):
+            print(f"⏭  {company}: 失敗が続いているためスキップ（サーキットブレーカー open）")
+            stats.status = "skipped"
+            return []
+        if breaker.state(company) == HALF_OPEN:
+            print(f"🩺 {company}: 復旧確認のため1回だけ試行（half-open）")
+            max_retries = 1
 
     for attempt in range(max_retries):
         try:
             print(f"🔍 {company} ニュース取得中 (試行 {attempt + 1}/{max_retries}): {url}")
             
-            # フィードを取得
-            feed = feedparser.parse(url)
-            
-            # ステータスコードをチェック
-            if hasattr(feed, 'status') and feed.status != 200:
-                print(f"⚠️  {company}: HTTP ステータス {feed.status}")
-                if attempt < max_retries - 1:
-                    time.sleep(2)
-                    continue
-            
-            # エントリが存在するかチェック
-            if not hasattr(feed, 'entries') or len(feed.entries) == 0:
-                print(f"⚠️  {company}: エントリが見つかりません")
-                if attempt < max_retries - 1:
-                    time.sleep(2)
-                    continue
+            # レート制限（リトライも1リクエストとして数える）
+            if rate_limiter:
+                rate_limiter.acquire(url)
+            if deadline is not None and time.monotonic() >= deadline:
+                print(f"⏰ {company}: 実行の期限を過ぎたため打ち切り")
+                stats.status = "late"
                 return []
 
-            # 一か月以内のニュースだけにフィルタ
-            filtered_entries = []
-            for entry in feed.entries:
-                if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                    pub_date = datetime(*entry.published_parsed[:6])
-                    if pub_date >= one_month_ago:
-                        filtered_entries.append(entry)
-
-            # 最大10件まで
-            filtered_entries = filtered_entries[:10]
-
-            print(f"✅ {company} 件数: {len(filtered_entries)}（1か月以内）")
-            return filtered_entries
+            # フィードを取得（前回の ETag / Last-Modified を送って条件付き GET）
+            stats.attempts += 1
+            started = time.perf_counter()
+            response = download(url, etag=etag, modified=modified, timeout=timeout, deadline=deadline)
+            stats.fetch_seconds += time.perf_counter() - started
+            stats.bytes_received += len(response.body)
+
+            # 304 なら前回パースしたエントリをそのまま使う（パースもしない）
+            cached_entries = cache.entries(url) if cache and response.status == 304 else None
+            if cached_entries is not None:
+                print(f"♻️  {company}: 更新なし（304）キャッシュを使用")
+                entries = cached_entries
+                stats.status = "not_modified"
+            else:
+                # ステータスコードをチェック
+                if response.status != 200:
+                    print(f"⚠️  {company}: HTTP ステータス {response.status}")
+                    if response.status == 304:
+                        # キャッシュが消えている場合は条件なしで取り直す
+                        etag = modified = None
+                    if attempt < max_retries - 1:
+                        backoff.sleep(attempt, deadline)
+                        continue
+                    raise RuntimeError(f"HTTP ステータス {response.status}")
+
+                started = time.perf_counter()
+                since = time.time() - NEWS_WINDOW_DAYS * 24 * 3600
+                feed = parse_feed(response, parser, since, parse_limit)
+                stats.parse_seconds += time.perf_counter() - started
+                
+                # フィードとして読めなかったとき（ブロックページの HTML など）は取り直し、最後は失敗として扱う
+                if not feed.get('version') or not hasattr(feed, 'entries'):
+                    print(f"⚠️  {company}: フィードとして読めません")
+                    if attempt < max_retries - 1:
+                        backoff.sleep(attempt, deadline)
+                        continue
+                    raise RuntimeError("フィードとして読めません")
+
+                entries = feed.entries
+                # 正しく読めたが期間内の記事がない場合は取り直さない（空のままキャッシュする）
+                stats.status = "ok" if entries else "empty"
+                if cache:
+                    cache.store(url, entries, response.headers.get('etag'), response.headers.get('last-modified'))
+
+            print(f"✅ {company} 件数: {len(entries)}")
+            if breaker:
+                breaker.record_success(company)
+            return entries
             
         except Exception as e:
             print(f"❌ {company} エラー (試行 {attempt + 1}): {e}")
+            if deadline is not None and time.monotonic() >= deadline:
+                # 期限による打ち切りはソースの失敗として数えない
+                print(f"⏰ {company}: 実行の期限を過ぎたため打ち切り")
+                stats.status = "late"
+                return []
             if attempt < max_retries - 1:
-                time.sleep(2)
+                backoff.sleep(attempt, deadline)
             else:
                 print(f"❌ {company}: 最大試行回数に達しました")
+                if breaker:
+                    breaker.record_failure(company)
+                stats.status = "failed"
                 return []
     
     return []
 
     
-def filter_entries(company, entries):
-    """会社ごとにニュースをフィルタリング（例：ソフトバンクのホークス除外）"""
-    if company == "ソフトバンク":
-        excluded_keywords = ["ホークス", "野球", "マウンド", "選手", "打者", "FA権", "モイネロ", "抹消", "１軍", "２軍", "登録", "昇格", "打撃", "優勝", "王会長", "連戦", "2ラン", "3ラン", "先制", "今季", "4番", "登録抹消", "投手", "試合", "連勝", "連敗", "引き分け", "猛打賞", "復帰", "離脱", "捕手", "安打", "監督", "球場", "打点", "ヒット", "二塁打", "三塁打", "巨人", "ホームラン", "打席", "プロ", "適時打", "育成", "手術", "グラウンド", "負傷", "近藤健介", "１軍", "城島", "失点", "交流戦", "マジック", "打球", "先発", "最下位", "起用", "退場", "守護神", "球団"]
-        return [entry for entry in entries if not any(kw in entry.title for kw in excluded_keywords)]
-    elif company == "SBI証券":
-        excluded_keywords = ["投資判断", "中立", "買い", "目標株価", "売り"]
-        return [entry for entry in entries if not any(kw in entry.title for kw in excluded_keywords)]
-    elif company == "ZOZO":
-        excluded_keywords = ["マリーンズ", "マリン", "ロッテ", "スタジアム"]
-        return [entry for entry in entries if not any(kw in entry.title for kw in excluded_keywords)]
-    return entries
+def filter_entries(company, entries, filters_path=FILTERS_PATH):
+    """会社ごとにニュースをフィルタリング（例：ソフトバンクのホークス除外、ルールは filters.json）"""
+    rules = load_filters(filters_path).get(company)
+    return rules.apply(entries) if rules else entries
 
 
 def get_company_icon(company):
-    icon_map = {
-        "ソフトバンク": "SB",
-        "大正製薬": "大",
-        "SBI証券": "SBI",
-        "ガンホー": "GH",
-        "GO": "GO",
-        "森ビル": "森",
-        "Spotify": "♪",
-        "Epic Games": "🎮",
-        "富士電機": "富",
-        "ZOZO": "ZZ",
-        "えがお": "笑",
-        "芝浦機械": "芝",
-        "M&Aキャピタル": "M&A",
-        "エアウィーヴ": "Air",
-        "PayPay": "PP",
-        "アスクル": "AS",
-        "UCC上島珈琲": "☕",
-        "TikTok": "TT",
-        "ispace": "🚀",
-        "プレミアグループ": "PG",
-        "TENTIAL": "🏋️",
-        "サイボウズ": "Cy",
-        "電通": "電",
-        "博報堂": "博",
-        "サイバーエージェント": "CA"
-    }
-    return icon_map.get(company, company[:2])
+    entry = REGISTRY.get(company)
+    return entry.icon if entry else company[:2]
 
 def get_tab_id(company):
-    tab_map = {
-        "ソフトバンク": "softbank",
-        "大正製薬": "taisho", 
-        "SBI証券": "sbi",
-        "ガンホー": "gungho",
-        "GO": "go",
-        "森ビル": "mori",
-        "Spotify": "spotify",
-        "Epic Games": "epic",
-        "富士電機": "fuji",
-        "ZOZO": "zozo",
-        "えがお": "egao",
-        "芝浦機械": "shibaura",
-        "M&Aキャピタル": "macapital",
-        "エアウィーヴ": "airweave",
-        "PayPay": "paypay",
-        "アスクル": "askul",
-        "UCC上島珈琲": "ucc",
-        "TikTok": "tiktok",
-        "ispace": "ispace",
-        "プレミアグループ": "premier",
-        "TENTIAL": "tential",
-        "サイボウズ": "cybozu",
-        "電通": "dentsu",
-        "博報堂": "hakuhodo",
-        "サイバーエージェント": "cyberagent"
-    }
-    return tab_map.get(company, company.lower())
-
-
-def generate_news_items(entries):
-    """ニュースアイテムのHTMLを生成"""
+    entry = REGISTRY.get(company)
+    return entry.tab_id if entry else company.lower()
+
+
+def iter_tab_nav(companies):
+    """タブボタンを生成（会社の並びは companies の順）"""
+    yield '                <button class="tab-button active" data-tab="all" data-shortcut="1">🌟 すべて</button>\n'
+    for company in companies:
+        entry = REGISTRY.get(company)
+        emoji, shortcut = (entry.emoji, entry.shortcut) if entry else ("📰", "")
+        shortcut_attr = f' data-shortcut="{shortcut}"' if shortcut else ""
+        yield f'                <button class="tab-button" data-tab="{get_tab_id(company)}"{shortcut_attr}>{emoji} {company}</button>\n'
+    yield '                <button class="tab-button" data-tab="quote" data-shortcut="5">💡 今日の格言</button>\n'
+    yield '                <button class="tab-button" data-tab="story" data-shortcut="6">📘 ショートストーリー</button>\n'
+
+def iter_news_items(entries):
+    """ニュースアイテムのHTMLを断片ごとに生成"""
     if not entries:
-        return "<li class='news-item'><div style='color: #e74c3c; font-style: italic;'>現在ニュースを取得できません。後ほど再度お試しください。</div></li>"
+        yield "<li class='news-item'><div style='color: #e74c3c; font-style: italic;'>現在ニュースを取得できません。後ほど再度お試しください。</div></li>"
+        return
 
-    # 日付でソート（新しい順）
-    entries.sort(key=lambda e: getattr(e, 'published_parsed', time.gmtime(0)), reverse=True)
-    
-    items = ""
-    for entry in entries:
-        try:
-            title = entry.title if hasattr(entry, 'title') else 'タイトルなし'
-            link = entry.link if hasattr(entry, 'link') else '#'
-            
-            # 日付があれば表示
-            pub_date = ""
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                try:
-                    date_obj = datetime(*entry.published_parsed[:6])
-                    pub_date = f"<div class='news-date'>{date_obj.strftime('%m/%d %H:%M')}</div>"
-                except:
-                    pass
-            
-            # HTMLエスケープ（簡易版）
-            title = title.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-            
-            items += f"""
+    # 日付でソート（新しい順）。日付の変換とエスケープは NewsItem を作るときに済んでいる
+    for item in sorted(entries, key=attrgetter('sort_key')):
+        yield f"""
             <li class="news-item">
-                <a href='{link}' target='_blank'>{title}</a>
-                {pub_date}
+                <a href='{item.link_html}' target='_blank'>{item.title_html}</a>
+                <div class='news-date'>{item.date_label}</div>
             </li>
             """
-            
-        except Exception as e:
-            print(f"⚠️  エントリ処理エラー: {e}")
-            continue
-    
-    return items
 
-def generate_news_section(company, entries, section_class="news-section scroll-fade"):
-    """ニュースセクションのHTMLを生成（タブ対応）"""
+def generate_news_items(entries):
+    """ニュースアイテムのHTMLを生成"""
+    return "".join(iter_news_items(entries))
+
+def iter_news_section(company, entries, section_class="news-section scroll-fade", notice=None):
+    """ニュースセクションのHTMLを断片ごとに生成（タブ対応。notice は見出しの下に出す注意書き）"""
     icon = get_company_icon(company)
-    news_items = generate_news_items(entries)
-    
-    return f"""
-    <div class="{section_class}">
+    yield f"""
+    <div class="{section_class}" data-tab="{get_tab_id(company)}">
         <h2><div class="company-icon">{icon}</div>{company} 最新ニュース</h2>
-        <ul class="news-list">
-            {news_items}
+"""
+    if notice:
+        yield f"""        <div class="news-notice">{notice}</div>
+"""
+    yield """        <ul class="news-list">
+            """
+    yield from iter_news_items(entries)
+    yield """
         </ul>
     </div>
     """
 
+def generate_news_section(company, entries, section_class="news-section scroll-fade"):
+    """ニュースセクションのHTMLを生成（タブ対応）"""
+    return "".join(iter_news_section(company, entries, section_class))
+
+def iter_all_news_tab(companies_data, notices=None):
+    """すべてのニュースタブのコンテンツを断片ごとに生成（notices は会社名 → 注意書き）"""
+    notices = notices or {}
+    for company, entries in companies_data.items():
+        yield from iter_news_section(company, entries, notice=notices.get(company))
+
 def generate_all_news_tab(companies_data):
     """すべてのニュースタブのコンテンツを生成"""
-    content = ""
-    for company, entries in companies_data.items():
-        content += generate_news_section(company, entries)
-    return content
+    return "".join(iter_all_news_tab(companies_data))
 
-def generate_individual_tabs(companies_data):
-    """個別企業タブのコンテンツを生成"""
-    tabs_content = ""
+def iter_individual_tabs(companies_data, notices=None):
+    """個別企業タブのコンテンツを断片ごとに生成（notices は会社名 → 注意書き）"""
+    notices = notices or {}
     for company, entries in companies_data.items():
         tab_id = get_tab_id(company)
-        section_content = generate_news_section(company, entries)
-        tabs_content += f"""
+        yield f"""
         <div class="tab-content" id="{tab_id}">
-            {section_content}
+            """
+        yield from iter_news_section(company, entries, notice=notices.get(company))
+        yield """
         </div>
         """
-    return tabs_content
+
+def generate_individual_tabs(companies_data):
+    """個別企業タブのコンテンツを生成"""
+    return "".join(iter_individual_tabs(companies_data))
 
 def generate_quote_tab(quote):
     """格言タブのコンテンツを生成"""
@@ -256,552 +307,67 @@ def generate_story_tab(story):
     </div>
     """
 
-def main():
-    """メイン処理"""
-    print("=" * 50)
-    print("📰 NEWS DIGEST 生成開始")
-    print("=" * 50)
-    
-    # 現在の日時
-    today = datetime.now().strftime('%Y年%m月%d日')
-    current_time = datetime.now().strftime('%H:%M')
-    
-    # 名言リスト
-    quotes = [
-        "「全盛期？これからだよ」 - 三浦知良",
-        "「成功する秘訣は、成功するまで諦めないことだ」 - アルベルト・アインシュタイン",
-        "「未来を予測する最良の方法は、それを創ることだ」 - ピーター・ドラッカー",
-        "「壁というのは、できないことを他人に証明するためにあるのではない」 - イチロー",
-        "「迷ったら前へ」 - 羽生善治",  
-        "「最も危険なのは、現状維持だ」 - ジェフ・ベゾス",
-        "「完璧を目指すより、まず終わらせろ」 - マーク・ザッカーバーグ",
-        "「失敗は選択肢の一つ。怖れずに早く失敗せよ」 - エリック・リース",
-        "「イノベーションはアイディアではなく、実行にある」 - イーロン・マスク",
-        "「人はプロダクトではなく、感情にお金を払う」 - スティーブ・ジョブズ",
-        "「未来を予測する最良の方法は、それを創ることだ」 - ピーター・ドラッカー",
-        "「勇気とは、恐れを感じながらも行動すること」 - ネルソン・マンデラ",
-        "「不可能だと決めつける前に、挑戦しよう」 - トーマス・エジソン",
-        "「遅くても進め。止まるな」 - 武田信玄",
-        "「行動はすべての成功の鍵である」 - パブロ・ピカソ",
-        "「できるかできないかじゃない。やるかやらないかだ」 - 大谷翔平",
-        "「限界なんて存在しない。あるのは壁だけだ」 - ウサイン・ボルト",
-        "「100回失敗しても、101回目で成功すればいい」 - イチロー",
-        "「チャンスは準備ができている人に訪れる」 - オプラ・ウィンフリー",
-        "「人生に失敗がないと、人生を失敗する」 - 本田宗一郎",
-        "「自分を信じなければ、誰も信じてくれない」 - セリーナ・ウィリアムズ",
-        "「時間は命そのもの。無駄にするな」 - ベンジャミン・フランクリン",
-        "「最も強い人は、笑顔を失わない人だ」 - マザー・テレサ",
-        "「夢を見ることができれば、それは実現できる」 - ウォルト・ディズニー",
-        "「勝ったときにこそ謙虚に。負けたときにこそ学べ」 - 羽生結弦",
-        "「学びて思わざればすなわち罔し」 - 孔子",
-        "「世界を動かすのは、熱意を持った少数だ」 - マハトマ・ガンジー",
-        "「君がどこへ行こうとも、全力を尽くせ」 - エイブラハム・リンカーン",
-        "「一番の近道は、地道である」 - イチロー",
-        "「私は失敗したことがない。ただ、1万通りの方法を見つけただけだ」 - トーマス・エジソン",
-        "「情熱があれば、知識は後からついてくる」 - 本田圭佑",
-        "「自分が変われば、世界が変わる」 - ガンジー",
-        "「苦しい時こそ、成長している」 - 長谷部誠",
-        "「夢を持て。それがすべての始まりだ」 - コービー・ブライアント",
-        "「失敗しても気にするな。99%は気にしていない」 - ウィル・スミス",
-        "「成功とは、情熱を失わずに失敗を重ねることだ」 - ウィンストン・チャーチル",
-        "「希望とは、夜明け前の最も暗い時間にある」 - セネカ",
-        "「偉大な仕事をする唯一の方法は、それを愛することだ」 - スティーブ・ジョブズ",
-        "「挑戦する勇気があれば、何でも可能だ」 - マイケル・ジョーダン",
-        "「壁というのは、できないことを証明するためにあるのではない」 - イチロー",
-        "「答えはいつも、行動の中にある」 - ジャック・マー",
-        "「最も確実に失敗する方法は、全員を喜ばせようとすることだ」 - ビル・コスビー",
-        "「成功は最終的なものではなく、失敗は致命的ではない」 - チャーチル",
-        "「どんなに遠い夢でも、第一歩を踏み出さなければ届かない」 - 孫正義",
-        "「人生は思った通りにはならないが、やった通りにはなる」 - 林修",
-        "「あなたの時間は限られている。だから他人の人生を生きるな」 - スティーブ・ジョブズ",
-        "「迷ったら前へ」 - 羽生善治",
-        "「始めなければ、何も始まらない」 - 堀江貴文",
-        "「才能とは、情熱を持ち続ける力」 - 落合陽一",
-        "「大切なのは、スピードではなく方向だ」 - ジョン・ウッデン",
-        "「賢者は愚者からも学び、愚者は誰からも学ばない」 - ソクラテス"
-    ]
-
-# ストーリーリスト（大幅に拡張）
-    stories = [
-        # 日常の小さな発見
-        "電車で出会った彼女との何気ない5分間の会話が、ずっと心に残っている。",
-        "ふとしたきっかけで始めた習慣が、人生を変える第一歩だった。",
-        "子供が描いた絵に、人生で一番大切なものが詰まっていた。",
-        "雨の日に傘を貸してくれたあの人の優しさが、ずっと記憶に残っている。",
-        "小さなカフェで見かけた、老夫婦の静かな時間に心を打たれた。",
-        
-        # 人とのつながり
-        "初めて会った人なのに、まるで昔からの友人のような気がした不思議な午後。",
-        "エレベーターで一緒になった見知らぬ人の笑顔が、一日を明るくしてくれた。",
-        "道に迷っていた時、親切に教えてくれた地元の人との短い会話。",
-        "電話の向こうの祖母の声が、どんな薬よりも心を癒してくれた。",
-        "バスで席を譲ってもらった時の、言葉にならない感謝の気持ち。",
-        
-        # 季節と自然
-        "桜の花びらが舞い散る中を歩いていて、時の流れを感じた春の日。",
-        "夏の夕立の後の、洗われたような空気の清々しさ。",
-        "紅葉を見上げながら、変化することの美しさを教わった。",
-        "雪景色に包まれた街で、静寂の中に聞こえる心の声。",
-        "朝の公園で出会った野良猫との、無言の交流。",
-        
-        # 記憶と思い出
-        "古いアルバムをめくりながら、忘れていた自分に再会した。",
-        "亡くなった父が愛用していた万年筆を手にした時の気持ち。",
-        "母の手料理の味を再現しようとして、愛情の深さを知った。",
-        "幼馴染からの突然の手紙が運んできた、懐かしい記憶。",
-        "実家の押し入れから出てきた、子供の頃の宝物。",
-        
-        # 仕事と成長
-        "新人の頃に失敗した仕事を、今なら違うやり方でできると気づいた瞬間。",
-        "後輩に教えている時、自分も成長していることを実感した。",
-        "長年の努力が実を結んだ時の、静かな達成感。",
-        "同僚の何気ない一言が、新しい視点を与えてくれた。",
-        "定年を迎えた先輩の最後の挨拶に込められた、仕事への想い。",
-        
-        # 学びと発見
-        "図書館で偶然手に取った本が、人生観を変えるきっかけになった。",
-        "新しい言語を学び始めて、世界が広がっていく感覚。",
-        "料理教室で失敗を重ねながら、諦めない心を育てた。",
-        "孫に教わったスマートフォンの使い方で、世代を超えた学び。",
-        "街歩きで発見した小さな路地が、冒険心を呼び覚ました。",
-        
-        # 創造と表現
-        "初めて書いた詩が、自分でも驚くほど心に響いた。",
-        "音楽を聴いていて、言葉にできない感情が溢れ出した。",
-        "写真を撮ることで、いつもの風景が特別に見えるようになった。",
-        "手作りのプレゼントを渡した時の、相手の嬉しそうな表情。",
-        "ガーデニングを通して、育てることの喜びを知った。",
-        
-        # 挑戦と変化
-        "40歳を過ぎてから始めた習い事が、新しい自分を発見させてくれた。",
-        "引っ越しを機に、生活スタイルを見直すことになった。",
-        "苦手だった人との関係が、ある出来事をきっかけに変わった。",
-        "健康診断の結果をきっかけに、生活習慣を見直し始めた。",
-        "子供の独立を機に、夫婦の時間を再発見した。",
-        
-        # 希望と未来
-        "困難な状況の中でも、小さな希望の光を見つけた。",
-        "次の世代に託したい想いを、言葉にして残すことにした。",
-        "失敗から学んだ教訓が、新しい挑戦への勇気をくれた。",
-        "夢を諦めそうになった時、支えてくれた人の存在に気づいた。",
-        "毎日の小さな積み重ねが、いつか大きな変化を生むと信じて。"
-    ]
-
-    # ランダム選択
-    quote = random.choice(quotes)
-    story = random.choice(stories)
-    
-    # ニュースデータを収集
-    companies_data = {}
-    total_articles = 0
-    
-    for company, url in rss_sources.items():
-        entries = get_news_for_company(company, url)
-        filtered_entries = filter_entries(company, entries)
-        companies_data[company] = filtered_entries
-        total_articles += len(filtered_entries)
-        
-        # レート制限対策：各リクエスト間に少し待機
-        time.sleep(1)
-    
-    print(f"📊 合計記事数: {total_articles}")
-    
-    # タブコンテンツ生成
-    all_news_content = generate_all_news_tab(companies_data)
-    individual_tabs_content = generate_individual_tabs(companies_data)
-    quote_tab_content = generate_quote_tab(quote)
-    story_tab_content = generate_story_tab(story)
-    
-    # HTMLテンプレート（タブ機能拡張版）
-    html_content = f"""<!DOCTYPE html>
+# HTMLテンプレート（タブ機能拡張版）
+PAGE_HEAD = """<!DOCTYPE html>
 <html lang="ja">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>11BP GFE NEWS DIGEST</title>
-    <style>
-        :root {{
-            --primary-color: #3498db;
-            --secondary-color: #2c3e50;
-            --accent-color: #e74c3c;
-            --success-color: #27ae60;
-            --warning-color: #f39c12;
-            --background-gradient: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            --card-shadow: 0 10px 30px rgba(0,0,0,0.1);
-            --transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        }}
-
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-
-        body {{ 
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Hiragino Sans', sans-serif; 
-            background: var(--background-gradient);
-            padding: 1em;
-            line-height: 1.6;
-            min-height: 100vh;
-            animation: fadeIn 0.8s ease-out;
-        }}
-
-        @keyframes fadeIn {{
-            from {{ opacity: 0; transform: translateY(20px); }}
-            to {{ opacity: 1; transform: translateY(0); }}
-        }}
-
-        @keyframes slideInUp {{
-            from {{ opacity: 0; transform: translateY(30px); }}
-            to {{ opacity: 1; transform: translateY(0); }}
-        }}
-
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-        }}
-
-        /* ヘッダー */
-        .header {{
-            text-align: center;
-            background: rgba(255, 255, 255, 0.95);
-            backdrop-filter: blur(10px);
-            padding: 2em;
-            border-radius: 20px;
-            box-shadow: var(--card-shadow);
-            margin-bottom: 2em;
-            animation: slideInUp 0.6s ease-out;
-        }}
-
-        .header h1 {{
-            color: var(--secondary-color);
-            font-size: 2.5em;
-            font-weight: 700;
-            margin-bottom: 0.5em;
-            background: linear-gradient(45deg, var(--primary-color), var(--secondary-color));
-            background-clip: text;
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        }}
-
-        .header-info {{
-            background: var(--secondary-color);
-            color: white;
-            padding: 1em 2em;
-            border-radius: 50px;
-            margin-top: 1em;
-            display: inline-block;
-            font-weight: 500;
-        }}
-
-        /* タブナビゲーション */
-        .tab-container {{
-            background: rgba(255, 255, 255, 0.95);
-            backdrop-filter: blur(10px);
-            border-radius: 15px;
-            padding: 1em;
-            margin-bottom: 2em;
-            box-shadow: var(--card-shadow);
-            animation: slideInUp 0.7s ease-out;
-        }}
-
-        .tab-nav {{
-            display: flex;
-            justify-content: center;
-            flex-wrap: wrap;
-            gap: 0.5em;
-            margin-bottom: 1em;
-        }}
-
-        .tab-button {{
-            background: transparent;
-            border: 2px solid var(--primary-color);
-            color: var(--primary-color);
-            padding: 0.8em 1.5em;
-            border-radius: 25px;
-            cursor: pointer;
-            font-weight: 600;
-            transition: var(--transition);
-            position: relative;
-            overflow: hidden;
-            font-size: 0.9em;
-        }}
-
-        .tab-button::before {{
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: var(--primary-color);
-            transition: var(--transition);
-            z-index: -1;
-        }}
-
-        .tab-button:hover::before,
-        .tab-button.active::before {{
-            left: 0;
-        }}
-
-        .tab-button:hover,
-        .tab-button.active {{
-            color: white;
-            transform: translateY(-2px);
-            box-shadow: 0 5px 15px rgba(52, 152, 219, 0.4);
-        }}
-
-        /* 特殊タブボタンのスタイル */
-        .tab-button[data-tab="quote"] {{
-            border-color: var(--success-color);
-            color: var(--success-color);
-        }}
-
-        .tab-button[data-tab="quote"]::before {{
-            background: var(--success-color);
-        }}
-
-        .tab-button[data-tab="story"] {{
-            border-color: var(--accent-color);
-            color: var(--accent-color);
-        }}
-
-        .tab-button[data-tab="story"]::before {{
-            background: var(--accent-color);
-        }}
-
-        /* ニュースセクション */
-        .tab-content {{
-            display: none;
-            animation: slideInUp 0.5s ease-out;
-        }}
-
-        .tab-content.active {{
-            display: block;
-        }}
-
-        .news-section {{
-            background: rgba(255, 255, 255, 0.95);
-            backdrop-filter: blur(10px);
-            padding: 2em;
-            margin-bottom: 1.5em;
-            border-radius: 20px;
-            box-shadow: var(--card-shadow);
-            border-left: 5px solid var(--primary-color);
-            transition: var(--transition);
-            animation: slideInUp 0.8s ease-out;
-        }}
-
-        .news-section:hover {{
-            transform: translateY(-5px);
-            box-shadow: 0 15px 40px rgba(0,0,0,0.15);
-        }}
-
-        .news-section h2 {{
-            color: var(--secondary-color);
-            margin-bottom: 1em;
-            font-size: 1.5em;
-            display: flex;
-            align-items: center;
-            gap: 0.5em;
-        }}
-
-        .company-icon {{
-            width: 40px;
-            height: 40px;
-            border-radius: 50%;
-            background: var(--primary-color);
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: white;
-            font-weight: bold;
-            font-size: 0.9em;
-        }}
-
-        .news-list {{
-            list-style: none;
-        }}
-
-        .news-item {{
-            padding: 1em 0;
-            border-bottom: 1px solid rgba(0,0,0,0.1);
-            transition: var(--transition);
-            position: relative;
-        }}
-
-        .news-item:last-child {{
-            border-bottom: none;
-        }}
-
-        .news-item:hover {{
-            padding-left: 1em;
-            background: rgba(52, 152, 219, 0.05);
-            border-radius: 10px;
-        }}
-
-        .news-item::before {{
-            content: '📰';
-            position: absolute;
-            left: -30px;
-            opacity: 0;
-            transition: var(--transition);
-        }}
-
-        .news-item:hover::before {{
-            opacity: 1;
-            left: 0;
-        }}
-
-        .news-item a {{
-            text-decoration: none;
-            color: var(--secondary-color);
-            font-weight: 500;
-            transition: var(--transition);
-            display: block;
-        }}
-
-        .news-item a:hover {{
-            color: var(--primary-color);
-            padding-left: 0.5em;
-        }}
-
-        .news-date {{
-            color: #7f8c8d;
-            font-size: 0.9em;
-            margin-top: 0.3em;
-        }}
-
-        /* 特別セクション */
-        .special-section {{
-            background: rgba(255, 255, 255, 0.95);
-            backdrop-filter: blur(10px);
-            padding: 2em;
-            border-radius: 20px;
-            box-shadow: var(--card-shadow);
-            transition: var(--transition);
-            animation: slideInUp 0.9s ease-out;
-            margin-bottom: 1.5em;
-        }}
-
-        .special-section:hover {{
-            transform: translateY(-5px) scale(1.02);
-            box-shadow: 0 15px 40px rgba(0,0,0,0.15);
-        }}
-
-        .special-section h2 {{
-            color: var(--secondary-color);
-            margin-bottom: 1em;
-            font-size: 1.5em;
-        }}
-
-        .quote-section {{
-            border-left: 5px solid var(--success-color);
-        }}
-
-        .story-section {{
-            border-left: 5px solid var(--accent-color);
-        }}
-
-        .quote-text {{
-            font-size: 1.2em;
-            font-style: italic;
-            color: var(--secondary-color);
-            position: relative;
-            padding: 1.5em;
-            background: rgba(39, 174, 96, 0.1);
-            border-radius: 15px;
-            line-height: 1.8;
-            text-align: center;
-        }}
-
-        .quote-text::before {{
-            content: '"';
-            font-size: 3em;
-            color: var(--success-color);
-            position: absolute;
-            top: -10px;
-            left: 20px;
-            font-family: serif;
-        }}
-
-        .quote-text::after {{
-            content: '"';
-            font-size: 3em;
-            color: var(--success-color);
-            position: absolute;
-            bottom: -20px;
-            right: 20px;
-            font-family: serif;
-        }}
-
-        .story-text {{
-            color: #34495e;
-            line-height: 1.8;
-            position: relative;
-            padding: 1.5em;
-            background: rgba(231, 76, 60, 0.1);
-            border-radius: 15px;
-            font-size: 1.1em;
-        }}
-
-        .story-text::before {{
-            content: '📖';
-            font-size: 2em;
-            position: absolute;
-            top: 10px;
-            left: 15px;
-            opacity: 0.3;
-        }}
-
-        /* フッター */
-        .footer {{
-            text-align: center;
-            color: rgba(255, 255, 255, 0.8);
-            margin-top: 3em;
-            padding: 2em;
-            background: rgba(255, 255, 255, 0.1);
-            backdrop-filter: blur(10px);
-            border-radius: 15px;
-            animation: slideInUp 1s ease-out;
-        }}
-
-        /* レスポンシブ */
-        @media (max-width: 768px) {{
-            body {{ padding: 0.5em; }}
-            .header h1 {{ font-size: 2em; }}
-            .tab-nav {{ 
-                flex-direction: column;
-                align-items: center;
-            }}
-            .tab-button {{
-                width: 200px;
-                text-align: center;
-            }}
-            .news-section, .special-section {{ padding: 1.5em; }}
-        }}
-
-        @media (max-width: 480px) {{
-            .tab-button {{
-                width: 100%;
-                padding: 1em;
-                font-size: 0.85em;
-            }}
-        }}
-
-        /* スクロールアニメーション */
-        .scroll-fade {{
-            opacity: 0;
-            transform: translateY(30px);
-            transition: var(--transition);
-        }}
-
-        .scroll-fade.visible {{
-            opacity: 1;
-            transform: translateY(0);
-        }}
-    </style>
-</head>
+"""
+
+def page_asset_names(render_mode=RENDER_MODE, search=False):
+    """ページで使う static/ のファイル名"""
+    names = ["app.css", "app.js"]
+    if render_mode == "shards":
+        names.append("shards.js")
+    if search:
+        names.append("search.js")
+    return names
+
+def iter_page_assets(assets, ext):
+    """CSS / JS の参照タグを生成（パスが None のものは static/ の内容をそのまま埋め込む）"""
+    for name, href in assets.items():
+        if not name.endswith(ext):
+            continue
+        if ext == ".css":
+            if href:
+                yield f'    <link rel="stylesheet" href="{href}">\n'
+            else:
+                yield "    <style>\n"
+                yield read_static(name)
+                yield "    </style>\n"
+        else:
+            if href:
+                yield f'    <script src="{href}" defer></script>\n'
+            else:
+                yield "    <script>\n"
+                yield read_static(name)
+                yield "    </script>\n"
+
+def iter_page(companies_data, quote, story, total_articles, today, current_time, render_mode=RENDER_MODE,
+              assets=None, updated_at="", content_hash=None, search_index=None, archive_index=None, notices=None):
+    """ページ全体のHTMLを断片ごとに生成（大きな文字列を組み立てずにそのまま書き出せる）
+
+    assets は static/ のファイル名から build_asset() で書き出したパスへの辞書で、
+    パスが None のもの（または assets 自体を省略した場合）はページに埋め込む。
+    content_hash を渡すと <meta name="digest-hash"> として埋め込む（compute_content_hash() を参照）。
+
+    render_mode が "single" の場合、各社のセクションは「すべて」タブに1回だけ出力し、
+    個別企業タブはブラウザ側でセクションを絞り込んで表示する。
+    "tabs" の場合は従来どおり個別企業タブにも同じセクションを出力する。
+    "shards" の場合は記事を出力せず、ブラウザが write_shards() の JSON を読み込んで表示する。
+    search_index（search_index.py の JSON の URL）を渡すと、見出しの検索欄を出力する。
+    archive_index（archive.py の一覧ページの URL）を渡すと、フッターに過去のニュースへのリンクを出力する。
+    notices（会社名 → 注意書き）は、その会社のセクションの見出しの下に出力する（取得が間に合わなかったソースなど）。
+    """
+    if assets is None:
+        assets = dict.fromkeys(page_asset_names(render_mode, bool(search_index)))
+    yield PAGE_HEAD
+    if content_hash:
+        yield f'    <meta name="digest-hash" content="{content_hash}">\n'
+    yield from iter_page_assets(assets, ".css")
+    yield f"""</head>
 <body>
     <div class="container">
         <!-- ヘッダー -->
@@ -810,168 +376,764 @@ def main():
             <div class="header-info">
                 📅 {today} | 🕐 {current_time} | 📊 {total_articles}件
             </div>
-        </div>
-
+"""
+    if search_index:
+        yield f"""            <div class="search-box">
+                <input type="search" id="search-input" data-index="{search_index}" placeholder="🔍 見出しを検索（直近{NEWS_WINDOW_DAYS}日）" autocomplete="off">
+            </div>
+"""
+    yield """        </div>
+"""
+    if search_index:
+        yield """
+        <!-- 検索結果 -->
+        <div class="news-section" id="search-results" hidden></div>
+"""
+    yield """
         <!-- タブナビゲーション -->
         <div class="tab-container">
             <div class="tab-nav">
-                <button class="tab-button active" data-tab="all">🌟 すべて</button>
-                <button class="tab-button" data-tab="softbank">📱 ソフトバンク</button>
-                <button class="tab-button" data-tab="taisho">💊 大正製薬</button>
-                <button class="tab-button" data-tab="sbi">💰 SBI証券</button>
-                <button class="tab-button" data-tab="gungho">🎮 ガンホー</button>
-                <button class="tab-button" data-tab="go">🚕 GO</button>
-                <button class="tab-button" data-tab="mori">🏢 森ビル</button>
-                <button class="tab-button" data-tab="spotify">♪ Spotify</button>
-                <button class="tab-button" data-tab="epic">🎮 Epic Games</button>
-                <button class="tab-button" data-tab="fuji">⚡ 富士電機</button>
-                <button class="tab-button" data-tab="zozo">👕 ZOZO</button>
-                <button class="tab-button" data-tab="egao">😊 えがお</button>
-                <button class="tab-button" data-tab="shibaura">🔧 芝浦機械</button>
-                <button class="tab-button" data-tab="macapital">📈 M&Aキャピタル</button>
-                <button class="tab-button" data-tab="airweave">🛏️ エアウィーヴ</button>
-                <button class="tab-button" data-tab="paypay">💳 PayPay</button>
-                <button class="tab-button" data-tab="askul">📦 アスクル</button>
-                <button class="tab-button" data-tab="ucc">☕ UCC上島珈琲</button>
-                <button class="tab-button" data-tab="tiktok">📱 TikTok</button>
-                <button class="tab-button" data-tab="ispace">🚀 ispace</button>
-                <button class="tab-button" data-tab="premier">🏆 プレミアグループ</button>
-                <button class="tab-button" data-tab="tential">⚡ TENTIAL</button>
-                <button class="tab-button" data-tab="cybozu">🗂 サイボウズ</button>
-                <button class="tab-button" data-tab="dentsu">📺 電通</button>
-                <button class="tab-button" data-tab="hakuhodo">📢 博報堂</button>
-                <button class="tab-button" data-tab="cyberagent">💻 サイバーエージェント</button>
-                <button class="tab-button" data-tab="quote">💡 今日の格言</button>
-                <button class="tab-button" data-tab="story">📘 ショートストーリー</button>
-            </div>
+"""
+    yield from iter_tab_nav(companies_data)
+    yield f"""            </div>
 
             <!-- すべてのニュース -->
-            <div class="tab-content active" id="all">
-                {all_news_content}
+            <div class="tab-content active" id="all"{f' data-shards="{SHARDS_DIR}/"' if render_mode == "shards" else ""}>
+                """
+    if render_mode != "shards":
+        yield from iter_all_news_tab(companies_data, notices)
+    yield """
             </div>
 
             <!-- 個別企業タブ -->
-            {individual_tabs_content}
+            """
+    if render_mode == "tabs":
+        yield from iter_individual_tabs(companies_data, notices)
+    yield """
 
             <!-- 格言タブ -->
-            {quote_tab_content}
+            """
+    yield generate_quote_tab(quote)
+    yield """
 
             <!-- ストーリータブ -->
-            {story_tab_content}
+            """
+    yield generate_story_tab(story)
+    yield f"""
         </div>
 
         <!-- フッター -->
         <div class="footer">
-            最終更新: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} JST<br>　
+            最終更新: {updated_at} JST<br>　
            Enjoy Daily Life with the Latest News
         </div>
-    </div>
+"""
+    if archive_index:
+        yield f"""        <div class="footer"><a href="{archive_index}">📚 過去のニュース</a></div>
+"""
+    yield """    </div>
     
-    <script>
-        // タブ切り替え機能
-        document.addEventListener('DOMContentLoaded', function() {{
-            const tabButtons = document.querySelectorAll('.tab-button');
-            const tabContents = document.querySelectorAll('.tab-content');
-
-            tabButtons.forEach(button => {{
-                button.addEventListener('click', function() {{
-                    const targetTab = this.getAttribute('data-tab');
-
-                    // アクティブ状態をリセット
-                    tabButtons.forEach(btn => btn.classList.remove('active'));
-                    tabContents.forEach(content => content.classList.remove('active'));
-
-                    // 新しいアクティブ状態を設定
-                    this.classList.add('active');
-                    document.getElementById(targetTab).classList.add('active');
-                }});
-            }});
-
-            // スクロールアニメーション
-            const observerOptions = {{
-                threshold: 0.1,
-                rootMargin: '0px 0px -100px 0px'
-            }};
-
-            const observer = new IntersectionObserver(function(entries) {{
-                entries.forEach(entry => {{
-                    if (entry.isIntersecting) {{
-                        entry.target.classList.add('visible');
-                    }}
-                }});
-            }}, observerOptions);
-
-            // スクロールフェード要素を監視
-            document.querySelectorAll('.scroll-fade').forEach(el => {{
-                observer.observe(el);
-            }});
-
-            // ニュースアイテムにホバーエフェクト
-            document.querySelectorAll('.news-item').forEach(item => {{
-                item.addEventListener('mouseenter', function() {{
-                    this.style.transform = 'translateX(10px)';
-                }});
-
-                item.addEventListener('mouseleave', function() {{
-                    this.style.transform = 'translateX(0)';
-                }});
-            }});
-
-            // キーボードショートカット
-            document.addEventListener('keydown', function(e) {{
-                if (e.altKey) {{
-                    switch(e.key) {{
-                        case '1':
-                            e.preventDefault();
-                            document.querySelector('[data-tab="all"]').click();
-                            break;
-                        case '2':
-                            e.preventDefault();
-                            document.querySelector('[data-tab="softbank"]').click();
-                            break;
-                        case '3':
-                            e.preventDefault();
-                            document.querySelector('[data-tab="taisho"]').click();
-                            break;
-                        case '4':
-                            e.preventDefault();
-                            document.querySelector('[data-tab="sbi"]').click();
-                            break;
-                        case '5':
-                            e.preventDefault();
-                            document.querySelector('[data-tab="quote"]').click();
-                            break;
-                        case '6':
-                            e.preventDefault();
-                            document.querySelector('[data-tab="story"]').click();
-                            break;
-                    }}
-                }}
-            }});
-        }});
-    </script>
-</body>
+"""
+    yield from iter_page_assets(assets, ".js")
+    yield """</body>
 </html>
 """
 
-    # HTMLファイル出力
+def shard_payload(company, entries, notice=None):
+    """会社ごとの JSON シャードの内容（記事は [タイトル, リンク, 日付] の配列で新しい順）"""
+    items = [[item.title, item.link, item.date_label] for item in sorted(entries, key=attrgetter('sort_key'))]
+    payload = {"company": company, "icon": get_company_icon(company), "items": items}
+    if notice:
+        payload["notice"] = notice
+    return payload
+
+def write_shards(companies_data, output_dir=".", notices=None):
+    """会社ごとに <SHARDS_DIR>/<タブID>.json を書き出す（内容が変わったものだけ）。書き換えた件数を返す"""
+    notices = notices or {}
+    shards_dir = os.path.join(output_dir, SHARDS_DIR)
+    os.makedirs(shards_dir, exist_ok=True)
+    written = 0
+    keep = set()
+    for company, entries in companies_data.items():
+        name = f"{get_tab_id(company)}.json"
+        keep.add(name)
+        content = json.dumps(shard_payload(company, entries, notices.get(company)), ensure_ascii=False, separators=(",", ":"))
+        path = os.path.join(shards_dir, name)
+        try:
+            with open(path, encoding="utf-8") as f:
+                if f.read() == content:
+                    continue
+        except FileNotFoundError:
+            pass
+        write_atomic(path, content)
+        written += 1
+
+    # なくなった会社のシャードを削除
+    for name in os.listdir(shards_dir):
+        if name.endswith(".json") and name not in keep:
+            os.remove(os.path.join(shards_dir, name))
+    return written
+
+def compute_content_hash(companies_data, total_articles, render_mode=RENDER_MODE, assets=None, search_index=None,
+                         archive_index=None, notices=None):
+    """日時・格言・ストーリーを空にしてページを描画し、そのハッシュを返す
+
+    記事・テンプレート・CSS / JS のいずれかが変わったときだけ値が変わる。
+    """
+    digest = hashlib.sha256()
+    for fragment in iter_page(companies_data, "", "", total_articles, "", "", render_mode, assets,
+                              search_index=search_index, archive_index=archive_index, notices=notices):
+        digest.update(fragment.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+def read_content_hash(path):
+    """既存のページに埋め込まれた digest-hash を返す（なければ None）"""
     try:
-        with open("index.html", "w", encoding="utf-8") as f:
-            f.write(html_content)
+        with open(path, encoding="utf-8") as f:
+            head = f.read(4096)
+    except FileNotFoundError:
+        return None
+    match = re.search(r'<meta name="digest-hash" content="([0-9a-f]+)">', head)
+    return match.group(1) if match else None
+
+# 格言（日付から1つ選ぶ）
+QUOTES = [
+    "「全盛期？これからだよ」 - 三浦知良",
+    "「成功する秘訣は、成功するまで諦めないことだ」 - アルベルト・アインシュタイン",
+    "「未来を予測する最良の方法は、それを創ることだ」 - ピーター・ドラッカー",
+    "「壁というのは、できないことを他人に証明するためにあるのではない」 - イチロー",
+    "「迷ったら前へ」 - 羽生善治",  
+    "「最も危険なのは、現状維持だ」 - ジェフ・ベゾス",
+    "「完璧を目指すより、まず終わらせろ」 - マーク・ザッカーバーグ",
+    "「失敗は選択肢の一つ。怖れずに早く失敗せよ」 - エリック・リース",
+    "「イノベーションはアイディアではなく、実行にある」 - イーロン・マスク",
+    "「人はプロダクトではなく、感情にお金を払う」 - スティーブ・ジョブズ",
+    "「未来を予測する最良の方法は、それを創ることだ」 - ピーター・ドラッカー",
+    "「勇気とは、恐れを感じながらも行動すること」 - ネルソン・マンデラ",
+    "「不可能だと決めつける前に、挑戦しよう」 - トーマス・エジソン",
+    "「遅くても進め。止まるな」 - 武田信玄",
+    "「行動はすべての成功の鍵である」 - パブロ・ピカソ",
+    "「できるかできないかじゃない。やるかやらないかだ」 - 大谷翔平",
+    "「限界なんて存在しない。あるのは壁だけだ」 - ウサイン・ボルト",
+    "「100回失敗しても、101回目で成功すればいい」 - イチロー",
+    "「チャンスは準備ができている人に訪れる」 - オプラ・ウィンフリー",
+    "「人生に失敗がないと、人生を失敗する」 - 本田宗一郎",
+    "「自分を信じなければ、誰も信じてくれない」 - セリーナ・ウィリアムズ",
+    "「時間は命そのもの。無駄にするな」 - ベンジャミン・フランクリン",
+    "「最も強い人は、笑顔を失わない人だ」 - マザー・テレサ",
+    "「夢を見ることができれば、それは実現できる」 - ウォルト・ディズニー",
+    "「勝ったときにこそ謙虚に。負けたときにこそ学べ」 - 羽生結弦",
+    "「学びて思わざればすなわち罔し」 - 孔子",
+    "「世界を動かすのは、熱意を持った少数だ」 - マハトマ・ガンジー",
+    "「君がどこへ行こうとも、全力を尽くせ」 - エイブラハム・リンカーン",
+    "「一番の近道は、地道である」 - イチロー",
+    "「私は失敗したことがない。ただ、1万通りの方法を見つけただけだ」 - トーマス・エジソン",
+    "「情熱があれば、知識は後からついてくる」 - 本田圭佑",
+    "「自分が変われば、世界が変わる」 - ガンジー",
+    "「苦しい時こそ、成長している」 - 長谷部誠",
+    "「夢を持て。それがすべての始まりだ」 - コービー・ブライアント",
+    "「失敗しても気にするな。99%は気にしていない」 - ウィル・スミス",
+    "「成功とは、情熱を失わずに失敗を重ねることだ」 - ウィンストン・チャーチル",
+    "「希望とは、夜明け前の最も暗い時間にある」 - セネカ",
+    "「偉大な仕事をする唯一の方法は、それを愛することだ」 - スティーブ・ジョブズ",
+    "「挑戦する勇気があれば、何でも可能だ」 - マイケル・ジョーダン",
+    "「壁というのは、できないことを証明するためにあるのではない」 - イチロー",
+    "「答えはいつも、行動の中にある」 - ジャック・マー",
+    "「最も確実に失敗する方法は、全員を喜ばせようとすることだ」 - ビル・コスビー",
+    "「成功は最終的なものではなく、失敗は致命的ではない」 - チャーチル",
+    "「どんなに遠い夢でも、第一歩を踏み出さなければ届かない」 - 孫正義",
+    "「人生は思った通りにはならないが、やった通りにはなる」 - 林修",
+    "「あなたの時間は限られている。だから他人の人生を生きるな」 - スティーブ・ジョブズ",
+    "「迷ったら前へ」 - 羽生善治",
+    "「始めなければ、何も始まらない」 - 堀江貴文",
+    "「才能とは、情熱を持ち続ける力」 - 落合陽一",
+    "「大切なのは、スピードではなく方向だ」 - ジョン・ウッデン",
+    "「賢者は愚者からも学び、愚者は誰からも学ばない」 - ソクラテス"
+]
+
+# ショートストーリー（日付から1つ選ぶ）
+STORIES = [
+    # 日常の小さな発見
+    "電車で出会った彼女との何気ない5分間の会話が、ずっと心に残っている。",
+    "ふとしたきっかけで始めた習慣が、人生を変える第一歩だった。",
+    "子供が描いた絵に、人生で一番大切なものが詰まっていた。",
+    "雨の日に傘を貸してくれたあの人の優しさが、ずっと記憶に残っている。",
+    "小さなカフェで見かけた、老夫婦の静かな時間に心を打たれた。",
+    
+    # 人とのつながり
+    "初めて会った人なのに、まるで昔からの友人のような気がした不思議な午後。",
+    "エレベーターで一緒になった見知らぬ人の笑顔が、一日を明るくしてくれた。",
+    "道に迷っていた時、親切に教えてくれた地元の人との短い会話。",
+    "電話の向こうの祖母の声が、どんな薬よりも心を癒してくれた。",
+    "バスで席を譲ってもらった時の、言葉にならない感謝の気持ち。",
+    
+    # 季節と自然
+    "桜の花びらが舞い散る中を歩いていて、時の流れを感じた春の日。",
+    "夏の夕立の後の、洗われたような空気の清々しさ。",
+    "紅葉を見上げながら、変化することの美しさを教わった。",
+    "雪景色に包まれた街で、静寂の中に聞こえる心の声。",
+    "朝の公園で出会った野良猫との、無言の交流。",
+    
+    # 記憶と思い出
+    "古いアルバムをめくりながら、忘れていた自分に再会した。",
+    "亡くなった父が愛用していた万年筆を手にした時の気持ち。",
+    "母の手料理の味を再現しようとして、愛情の深さを知った。",
+    "幼馴染からの突然の手紙が運んできた、懐かしい記憶。",
+    "実家の押し入れから出てきた、子供の頃の宝物。",
+    
+    # 仕事と成長
+    "新人の頃に失敗した仕事を、今なら違うやり方でできると気づいた瞬間。",
+    "後輩に教えている時、自分も成長していることを実感した。",
+    "長年の努力が実を結んだ時の、静かな達成感。",
+    "同僚の何気ない一言が、新しい視点を与えてくれた。",
+    "定年を迎えた先輩の最後の挨拶に込められた、仕事への想い。",
+    
+    # 学びと発見
+    "図書館で偶然手に取った本が、人生観を変えるきっかけになった。",
+    "新しい言語を学び始めて、世界が広がっていく感覚。",
+    "料理教室で失敗を重ねながら、諦めない心を育てた。",
+    "孫に教わったスマートフォンの使い方で、世代を超えた学び。",
+    "街歩きで発見した小さな路地が、冒険心を呼び覚ました。",
+    
+    # 創造と表現
+    "初めて書いた詩が、自分でも驚くほど心に響いた。",
+    "音楽を聴いていて、言葉にできない感情が溢れ出した。",
+    "写真を撮ることで、いつもの風景が特別に見えるようになった。",
+    "手作りのプレゼントを渡した時の、相手の嬉しそうな表情。",
+    "ガーデニングを通して、育てることの喜びを知った。",
+    
+    # 挑戦と変化
+    "40歳を過ぎてから始めた習い事が、新しい自分を発見させてくれた。",
+    "引っ越しを機に、生活スタイルを見直すことになった。",
+    "苦手だった人との関係が、ある出来事をきっかけに変わった。",
+    "健康診断の結果をきっかけに、生活習慣を見直し始めた。",
+    "子供の独立を機に、夫婦の時間を再発見した。",
+    
+    # 希望と未来
+    "困難な状況の中でも、小さな希望の光を見つけた。",
+    "次の世代に託したい想いを、言葉にして残すことにした。",
+    "失敗から学んだ教訓が、新しい挑戦への勇気をくれた。",
+    "夢を諦めそうになった時、支えてくれた人の存在に気づいた。",
+    "毎日の小さな積み重ねが、いつか大きな変化を生むと信じて。"
+]
+
+def pick_for_date(items, date):
+    """日付から決まる要素を1つ選ぶ（同じ日なら何度実行しても同じ）"""
+    return random.Random(date.toordinal()).choice(items)
+
+def parse_args(argv=None):
+    """コマンドライン引数を解析"""
+    parser = argparse.ArgumentParser(description="11BP GFE NEWS DIGEST 生成")
+    parser.add_argument("command", nargs="?", choices=("run", "daemon", "serve"), default="run",
+                        help="run: 1回取得して生成（既定） / daemon: 常駐してソースごとの間隔で取得し、"
+                             "記事が変わったときだけ生成 / serve: daemon に加えて、生成した内容を HTTP で配信")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help=f"同時に取得するフィード数（1で逐次取得、既定: {MAX_WORKERS}）")
+    parser.add_argument("--rate", type=float, default=RATE_LIMIT,
+                        help=f"1ホストあたりの1秒間のリクエスト数。0 で制限しない（既定: {RATE_LIMIT}）")
+    parser.add_argument("--burst", type=int, default=RATE_LIMIT_BURST,
+                        help=f"連続で送ってよいリクエスト数（既定: {RATE_LIMIT_BURST}）")
+    parser.add_argument("--retries", type=int, default=MAX_RETRIES,
+                        help=f"1ソースあたりの最大試行回数（既定: {MAX_RETRIES}）")
+    parser.add_argument("--retry-base", type=float, default=RETRY_BASE_DELAY,
+                        help=f"リトライ間隔の初期値・秒（指数バックオフ＋ジッター、既定: {RETRY_BASE_DELAY}）")
+    parser.add_argument("--retry-max", type=float, default=RETRY_MAX_DELAY,
+                        help=f"リトライ間隔の上限・秒（既定: {RETRY_MAX_DELAY}）")
+    parser.add_argument("--breaker-threshold", type=int, default=BREAKER_THRESHOLD,
+                        help=f"この回数の実行で連続失敗したソースをスキップ（既定: {BREAKER_THRESHOLD}）")
+    parser.add_argument("--breaker-cooldown", type=float, default=BREAKER_COOLDOWN,
+                        help=f"スキップしたソースを再試行するまでの秒数（既定: {BREAKER_COOLDOWN}）")
+    parser.add_argument("--no-breaker", action="store_true",
+                        help="サーキットブレーカーを使わずにすべてのソースを取得する")
+    parser.add_argument("--parser", choices=("fast", "feedparser"), default=PARSER,
+                        help="フィードのパーサー。fast は Google ニュースの RSS 専用の軽量パーサーで、"
+                             f"想定外の形なら feedparser を使う（既定: {PARSER}）")
+    parser.add_argument("--parse-limit", type=int, default=PARSE_LIMIT,
+                        help="1フィードから読む記事数の上限。達したら残りを読まない（fast のみ、0 で全件、"
+                             f"既定: {PARSE_LIMIT}）")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help="検索語を OR でつないで1リクエストにまとめる会社数。記事はタイトルの検索語で"
+                             f"会社ごとに分け直す（既定: {BATCH_SIZE}、まとめない）")
+    parser.add_argument("--no-server-window", dest="server_window", action="store_false",
+                        help=f"検索語に when:{NEWS_WINDOW_DAYS}d を付けず、期間の絞り込みを手元だけで行う")
+    parser.add_argument("--filters", default=FILTERS_PATH,
+                        help="会社ごとの除外・必須キーワードの設定ファイル（既定: filters.json）")
+    parser.add_argument("--store-path", default=STORE_PATH,
+                        help=f"記事を蓄積する SQLite ファイル（既定: {STORE_PATH}）")
+    parser.add_argument("--dedup-distance", type=int, default=MAX_DISTANCE,
+                        help=f"タイトルの SimHash がこのビット数以内なら同じ記事とみなす（既定: {MAX_DISTANCE}）")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="会社をまたいだ重複記事の除去を行わない")
+    parser.add_argument("--render-mode", choices=("single", "tabs", "shards"), default=RENDER_MODE,
+                        help="single: 各社のセクションを1回だけ出力しタブで絞り込む / "
+                             "tabs: 個別企業タブにも同じセクションを出力 / "
+                             f"shards: 会社ごとの JSON を {SHARDS_DIR}/ に書き出しタブを開いたときに読み込む"
+                             f"（既定: {RENDER_MODE}）")
+    parser.add_argument("--inline-assets", action="store_true",
+                        help="CSS / JS を assets/ に書き出さず、従来どおりページに埋め込む")
+    parser.add_argument("--search-index", default=SEARCH_INDEX_PATH,
+                        help="見出しの検索索引（文字バイグラムの JSON）の出力先。index.html からの相対 URL としても使う。"
+                             f"空文字で検索欄を出さない（既定: {SEARCH_INDEX_PATH}）")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR,
+                        help="日ごとのアーカイブページの出力先。空文字でアーカイブを作らない"
+                             f"（既定: {ARCHIVE_DIR}）")
+    parser.add_argument("--force-write", action="store_true",
+                        help="記事に変更がなくても index.html を書き直す")
+    parser.add_argument("--report", default=REPORT_PATH,
+                        help=f"実行レポート（JSON）の出力先。空文字で出力しない（既定: {REPORT_PATH}）")
+    parser.add_argument("--prometheus", default=PROMETHEUS_PATH,
+                        help=f"Prometheus の textfile 形式の出力先。空文字で出力しない（既定: {PROMETHEUS_PATH}）")
+    parser.add_argument("--min-interval", type=float, default=MIN_INTERVAL,
+                        help=f"daemon: ソースごとの取得間隔の下限・秒（新着が続くとここまで縮む、既定: {MIN_INTERVAL}）")
+    parser.add_argument("--max-interval", type=float, default=MAX_INTERVAL,
+                        help=f"daemon: ソースごとの取得間隔の上限・秒（新着がないとここまで延びる、既定: {MAX_INTERVAL}）")
+    parser.add_argument("--schedule-path", default=SCHEDULE_PATH,
+                        help=f"daemon: 取得間隔の保存先（既定: {SCHEDULE_PATH}）")
+    parser.add_argument("--host", default=HOST, help=f"serve: 待ち受けるアドレス（既定: {HOST}）")
+    parser.add_argument("--port", type=int, default=PORT, help=f"serve: 待ち受けるポート（既定: {PORT}）")
+    parser.add_argument("--deadline", type=float, default=DEADLINE,
+                        help="1回の取得全体の期限（秒）。過ぎたら残りのソースを打ち切り、取得できた分で生成する。"
+                             f"0 で期限なし（既定: {DEADLINE}）")
+    parser.add_argument("--connect-timeout", type=float, default=CONNECT_TIMEOUT,
+                        help=f"1リクエストの接続のタイムアウト（秒、既定: {CONNECT_TIMEOUT}）")
+    parser.add_argument("--read-timeout", type=float, default=READ_TIMEOUT,
+                        help=f"応答・本文のデータが届かないまま待つ時間の上限（秒、既定: {READ_TIMEOUT}）")
+    snapshot = parser.add_mutually_exclusive_group()
+    snapshot.add_argument("--record", metavar="PATH",
+                          help="run: 取得した応答（本文とヘッダー）を gzip 圧縮した JSON に保存する")
+    snapshot.add_argument("--replay", metavar="PATH",
+                          help="run: ネットワークに接続せず、--record で保存した応答から生成する")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ETag / Last-Modified のキャッシュを使わずに全件取得する")
+    parser.add_argument("--cache-path", default=FEED_CACHE_PATH,
+                        help=f"フィードキャッシュの保存先（既定: {FEED_CACHE_PATH}）")
+    args = parser.parse_args(argv)
+    if (args.record or args.replay) and args.command != "run":
+        parser.error("--record / --replay は run でのみ使えます")
+    if args.rate < 0:
+        parser.error("--rate は 0 以上を指定してください（0 で制限しない）")
+    if args.replay:
+        # 再生ではスナップショットの記事だけで描画する。検索索引は更新しないので、検索欄も出さない
+        args.search_index = ""
+    return args
+
+class Fetcher:
+    """取得に使う状態（HTTP セッション・レート制限・キャッシュ・サーキットブレーカー）。daemon では取得のたびに使い回す"""
+
+    def __init__(self, args):
+        self.args = args
+        self.download = download
+        self.retries = args.retries
+        self.recorder = None
+        self.session = None
+        self.http_counts = (0, 0)   # 前回の取得までのリクエスト数・接続数（取得ごとの差分を出す）
+        self.backoff = Backoff(args.retry_base, args.retry_max)
+        if args.replay:
+            # 再生はネットワークに接続しないので、レート制限・キャッシュ・サーキットブレーカー・再試行を使わない
+            replay = SnapshotReplay.load(args.replay)
+            recorded_at = datetime.fromtimestamp(replay.recorded_at).strftime('%Y-%m-%d %H:%M')
+            print(f"📼 スナップショットを再生: {args.replay}（{recorded_at} 記録、{len(replay.responses)} 件）")
+            self.download = replay.download
+            self.retries = 1
+            self.rate_limiter = self.cache = self.breaker = None
+            return
+        # 同じホストへの接続（TLS のハンドシェイクを含む）を取得のたびに張り直さず、プールして使い回す
+        self.session = new_session(args.workers)
+        self.download = partial(download, session=self.session)
+        # レート制限対策：固定の待機ではなくホスト単位のトークンバケットで間隔を調整
+        self.rate_limiter = HostRateLimiter(args.rate, args.burst) if args.rate else None
+        # 記録するときは本文が必要なので条件付き GET（キャッシュ）を使わない
+        self.cache = None if args.no_cache or args.record else FeedCache(args.cache_path)
+        self.breaker = None if args.no_breaker else CircuitBreaker(
+            BREAKER_PATH, failure_threshold=args.breaker_threshold, cooldown=args.breaker_cooldown)
+        if args.record:
+            self.recorder = SnapshotRecorder(args.record)
+            self.download = self.recorder.wrap(self.download)
+
+    def fetch(self, plans, metrics):
+        """取得計画のフィードを並列に取得し、(会社名 → エントリ, 取得できなかった会社名 → status) を返す
+
+        取得できなかったソース（期限切れの late・失敗の failed・サーキットブレーカーの skipped）は結果に含めない
+        （ストアの前回までの記事がそのまま残る）。前回失敗したソースは再試行せず、短いタイムアウトで1回だけ試す。
+        """
+        args = self.args
+        started = time.monotonic()
+        deadline = started + args.deadline if args.deadline else None
+        flaky = {plan.key for plan in plans if self.breaker and self.breaker.failures(plan.key)}
+        if flaky:
+            print(f"🩹 前回失敗したソース {len(flaky)} 件は1回だけ短い時間（読み込み {FLAKY_READ_TIMEOUT:.0f} 秒）で取り直します")
+
+        def fetch_one(key, url):
+            read_timeout = min(args.read_timeout, FLAKY_READ_TIMEOUT) if key in flaky else args.read_timeout
+            return get_news_for_company(
+                key, url, max_retries=1 if key in flaky else self.retries, rate_limiter=self.rate_limiter,
+                cache=self.cache, breaker=self.breaker, backoff=self.backoff, metrics=metrics,
+                parser=args.parser, parse_limit=args.parse_limit, download=self.download,
+                timeout=(args.connect_timeout, read_timeout), deadline=deadline)
+
+        with metrics.stage("fetch"):
+            results = fetch_all({plan.key: plan.url for plan in plans}, fetch_one,
+                                max_workers=args.workers, deadline=deadline)
+            for plan in plans:
+                if plan.key not in results:
+                    metrics.source(plan.key).status = "late"
+            stale_plans = [plan for plan in plans if metrics.source(plan.key).status in STALE_REASONS]
+            for plan in stale_plans:
+                results.pop(plan.key, None)
+            unavailable = {name: metrics.source(plan.key).status for plan in stale_plans for name in plan.members}
+            results = split_results(plans, results,
+                                    [name for plan in plans for name in plan.members if name not in unavailable])
+            if self.cache:
+                self.cache.save()
+            if self.breaker:
+                self.breaker.save()
+        if self.recorder:
+            print(f"📼 スナップショットを記録: {self.recorder.save()} 件（{self.recorder.path}）")
+        print(f"⏱  取得時間: {time.monotonic() - started:.1f} 秒（並列数 {args.workers}）")
+        if self.session:
+            self.report_connections(metrics)
+        late = [name for name, status in unavailable.items() if status == "late"]
+        if late:
+            metrics.count("sources_late", sum(1 for plan in stale_plans if metrics.source(plan.key).status == "late"))
+            print(f"⏰ 期限（{args.deadline:.0f} 秒）までに取得できなかったソース: {', '.join(late)}")
+        if unavailable:
+            metrics.count("sources_stale", len(stale_plans))
+            print(f"🗂  前回までの記事を表示するソース: {', '.join(unavailable)}")
+        return results, unavailable
+
+    def report_connections(self, metrics):
+        """この取得で送ったリクエスト数・新しく張った接続数と、接続を使い回した回数"""
+        sent, connections = connection_stats(self.session)
+        sent, connections = sent - self.http_counts[0], connections - self.http_counts[1]
+        self.http_counts = (self.http_counts[0] + sent, self.http_counts[1] + connections)
+        reused = max(0, sent - connections)
+        metrics.count("http_requests", sent)
+        metrics.count("http_connections", connections)
+        metrics.count("http_connections_reused", reused)
+        print(f"🔗 HTTP: {sent} リクエストで {connections} 接続（使い回し {reused} 回）")
+
+    def print_breaker_summary(self, plans):
+        """サーキットブレーカーの状態"""
+        if not self.breaker:
+            return
+        states = self.breaker.summary([plan.key for plan in plans])
+        closed = sum(1 for _, state, _ in states if state == CLOSED)
+        print(f"🔌 サーキットブレーカー: closed {closed} / 全 {len(states)} ソース")
+        for company, state, failures in states:
+            if state != CLOSED:
+                print(f"   {STATE_LABELS[state]} {company}（連続失敗 {failures} 回）")
+
+def plan_sources(args):
+    """取得計画（検索をまとめ、期間の指定 when: をサーバー側に渡す）"""
+    plans = plan_queries(rss_sources, args.batch_size, NEWS_WINDOW_DAYS if args.server_window else None)
+    print(f"🗺  取得計画: {len(rss_sources)} 社を {len(plans)} リクエストで取得")
+    return plans
+
+def ingest(store, results, metrics, filters_path=FILTERS_PATH, plans=()):
+    """キーワードで絞り込んだ記事のうち、まだ保存していないものだけをストアに追加。会社ごとの新着件数を返す
+
+    results は取得に成功した会社だけを含む（Fetcher.fetch() を参照）。成功した日時もストアに記録する。
+    残した・除外した・新着の件数は、取得時の計測と同じ行になるよう取得計画（plans）の key ごとに足し合わせる。
+    """
+    stats_keys = {name: plan.key for plan in plans for name in plan.members}
+    new_counts = {}
+    for company, entries in results.items():
+        stats = metrics.source(stats_keys.get(company, company))
+        with metrics.stage("filter"):
+            kept = filter_entries(company, entries, filters_path)
+        stats.entries_kept += len(kept)
+        stats.entries_dropped += len(entries) - len(kept)
+        with metrics.stage("store"):
+            new_counts[company] = store.upsert(company, kept)
+        stats.entries_new += new_counts[company]
+    store.mark_refreshed(results)
+    new_articles = sum(new_counts.values())
+    metrics.count("articles_new", new_articles)
+    print(f"🗃  新着記事: {new_articles} 件（{store.path} に保存）")
+    return new_counts
+
+def stale_notices(store, unavailable):
+    """取得できなかった会社（会社名 → status）のセクションに出す注意書き（前回までの記事を取得した日時を添える）
+
+    ストアに表示できる記事がない会社は、前回までの記事を出しているとは書かない。
+    """
+    refreshed = store.refreshed_at(unavailable)
+    since = time.time() - NEWS_WINDOW_DAYS * 24 * 3600
+    notices = {}
+    for company, status in unavailable.items():
+        if not store.recent(company, since, 1):
+            notices[company] = f"{STALE_REASONS[status]}、表示できる記事がありません"
+        elif company in refreshed:
+            age = datetime.fromtimestamp(refreshed[company]).strftime('%m/%d %H:%M')
+            notices[company] = f"{STALE_REASONS[status]}、{age} に取得した記事を表示しています"
+        else:
+            notices[company] = f"{STALE_REASONS[status]}、前回までに取得した記事を表示しています"
+    return notices
+
+def load_articles(store, companies, metrics, filters_path=FILTERS_PATH):
+    """表示する記事（直近 NEWS_WINDOW_DAYS 日・1社 MAX_ARTICLES 件）をストアから取り出す
+
+    保存済みの記事にも今のフィルタを掛ける（保存した後に filters.json のルールを足しても表示に反映される。
+    検索索引とアーカイブも同じフィルタで絞る。update_search() / archive_days() を参照）。
+    フィルタのある会社は期間内の全件を読み、絞り込んでから MAX_ARTICLES 件にする。
+    """
+    since = time.time() - NEWS_WINDOW_DAYS * 24 * 3600
+    filters = load_filters(filters_path)
+    companies_data = {}
+    with metrics.stage("store"):
+        for company in companies:
+            rules = filters.get(company)
+            if rules:
+                companies_data[company] = rules.apply(store.recent(company, since, None))[:MAX_ARTICLES]
+            else:
+                companies_data[company] = store.recent(company, since, MAX_ARTICLES)
+    return companies_data
+
+def update_search(store, args, metrics):
+    """見出しの検索索引に、前回より後に保存した記事を足す（期間外になった記事とフィルタで除外する記事は除く）。書き出したかを返す"""
+    since = time.time() - NEWS_WINDOW_DAYS * 24 * 3600
+    with metrics.stage("search"):
+        added, removed, written = update_search_index(store, since, args.search_index, load_filters(args.filters))
+    print(f"🔎 検索索引: 追加 {added} 件 / 期間外・除外 {removed} 件{'' if written else '（変更なし）'}")
+    return written
+
+def archive_days(store, args, metrics):
+    """昨日までのアーカイブページを追加（書き出し済みの日は触らない）。追加したかを返す"""
+    with metrics.stage("archive"):
+        added = update_archive(store, list(rss_sources), archive_dir=args.archive_dir,
+                               filters=load_filters(args.filters))
+    if added:
+        print(f"📚 アーカイブを追加: {', '.join(day.isoformat() for day in added)}（{args.archive_dir}/）")
+    return bool(added)
+
+def dedupe_articles(companies_data, metrics, max_distance=MAX_DISTANCE):
+    """配信記事の重複を除去（同じ記事は優先順位の高い1件だけ残す）"""
+    before = sum(len(entries) for entries in companies_data.values())
+    with metrics.stage("dedup"):
+        companies_data = dedupe(companies_data, max_distance)
+    removed = before - sum(len(entries) for entries in companies_data.values())
+    metrics.count("articles_deduplicated", removed)
+    print(f"🧹 重複記事を除去: {removed} 件")
+    return companies_data
+
+def write_digest(companies_data, args, metrics, now=None, notices=None, force=False):
+    """index.html（と assets / shards）を書き出す。index.html もシャードも書き換えなかった場合は False を返す
+
+    notices は会社名 → セクションに出す注意書き（iter_page() を参照）。
+    force なら記事に変更がなくても書き直す（--force-write と同じ。日付が変わったときなど）。
+    """
+    now = now or datetime.now()
+    today = now.strftime('%Y年%m月%d日')
+    current_time = now.strftime('%H:%M')
+
+    # 日付から選択（同じ日に再実行しても変わらない）
+    quote = pick_for_date(QUOTES, now.date())
+    story = pick_for_date(STORIES, now.date())
+
+    total_articles = sum(len(entries) for entries in companies_data.values())
+    metrics.count("articles_rendered", total_articles)
+    print(f"📊 合計記事数: {total_articles}")
+
+    # HTMLファイル出力（断片を順に書き出し、最後にリネームで置き換え）
+    try:
+        # CSS / JS は内容のハッシュ付きのファイル名で書き出し、ブラウザにキャッシュさせる
+        with metrics.stage("assets"):
+            assets = {name: None if args.inline_assets else build_asset(name)
+                      for name in page_asset_names(args.render_mode, bool(args.search_index))}
+
+        # shards の場合は記事を会社ごとの JSON に書き出す（ページは枠だけ）
+        written = 0
+        if args.render_mode == "shards":
+            with metrics.stage("shards"):
+                written = write_shards(companies_data, notices=notices)
+            print(f"🧩 {SHARDS_DIR}/ のシャードを更新: {written} / {len(companies_data)} 件")
+
+        # 記事に変更がなければ index.html に触らない（日時だけの差分でコミットしない）
+        archive_index = f"{args.archive_dir}/index.html" if args.archive_dir else None
+        with metrics.stage("hash"):
+            content_hash = compute_content_hash(companies_data, total_articles, args.render_mode, assets,
+                                                args.search_index, archive_index, notices)
+        if not (args.force_write or force) and read_content_hash("index.html") == content_hash:
+            print(f"♻️  記事に変更がないため index.html は更新しません（{content_hash}）")
+            return written > 0
+        with metrics.stage("write"):
+            file_size = write_atomic("index.html", metrics.timed("render", iter_page(
+                companies_data, quote, story, total_articles, today, current_time, args.render_mode, assets,
+                updated_at=now.strftime('%Y-%m-%d %H:%M:%S'), content_hash=content_hash,
+                search_index=args.search_index, archive_index=archive_index, notices=notices)))
+        if not args.inline_assets:
+            prune_assets(assets.values())
         print("✅ index.html を正常に生成しました")
-        
-        # ファイルサイズを確認
-        import os
-        file_size = os.path.getsize("index.html")
         print(f"📁 ファイルサイズ: {file_size:,} bytes")
-        
+        return True
+
     except Exception as e:
         print(f"❌ ファイル書き込みエラー: {e}")
         raise
-    
+
+def report_metrics(metrics, args):
+    """計測結果（段階ごとの時間と遅いソース）を表示し、レポートを書き出す"""
+    stages = " / ".join(f"{name} {seconds:.2f}s" for name, seconds in metrics.stages.items())
+    print(f"⏱  段階ごとの時間: {stages}")
+    slowest = ", ".join(f"{s.name} {s.fetch_seconds:.2f}s" for s in metrics.slowest_sources(5))
+    print(f"🐢 取得に時間がかかったソース: {slowest}")
+    if args.report:
+        metrics.write_json(args.report)
+    if args.prometheus:
+        metrics.write_prometheus(args.prometheus)
+    print(f"📈 実行レポート: {args.report or '-'} / Prometheus: {args.prometheus or '-'}")
+
+def run_once(args):
+    """全ソースを1回取得してページを生成する（cron から呼ぶ既定の動作）"""
+    metrics = RunMetrics()
+
+    print("=" * 50)
+    print("📰 NEWS DIGEST 生成開始")
+    print("=" * 50)
+
+    fetcher = Fetcher(args)
+    plans = plan_sources(args)
+    results, unavailable = fetcher.fetch(plans, metrics)
+
+    # 新しい記事だけをストアに追加し、表示する記事は期間指定のクエリで取り出す
+    # （再生ではスナップショットの記事だけで描画するため、ストアはメモリに作り、検索索引とアーカイブは更新しない）
+    store = ArticleStore(":memory:" if args.replay else args.store_path)
+    ingest(store, results, metrics, args.filters, plans)
+    if args.search_index:
+        update_search(store, args, metrics)
+    if args.archive_dir and not args.replay:
+        archive_days(store, args, metrics)
+    companies_data = load_articles(store, rss_sources, metrics, args.filters)
+    notices = stale_notices(store, unavailable)
+    store.close()
+
+    if not args.no_dedup:
+        companies_data = dedupe_articles(companies_data, metrics, args.dedup_distance)
+
+    fetcher.print_breaker_summary(plans)
+    write_digest(companies_data, args, metrics, notices=notices)
+    report_metrics(metrics, args)
+
     print("=" * 50)
     print("🎉 NEWS DIGEST 生成完了")
     print("=" * 50)
 
+def run_daemon(args, on_render=None):
+    """常駐して、ソースごとの間隔で取得し、記事が変わったときだけページを書き直す
+
+    ページ・シャード・検索索引・アーカイブのいずれかを書き換えたら、その回の最後に on_render を呼ぶ。
+    """
+    print("=" * 50)
+    print(f"📡 NEWS DIGEST 常駐モード開始（取得間隔 {args.min_interval / 60:.0f}〜{args.max_interval / 60:.0f} 分）")
+    print("=" * 50)
+
+    fetcher = Fetcher(args)
+    plans = {plan.key: plan for plan in plan_sources(args)}
+    schedule = PollSchedule(args.schedule_path, args.min_interval, args.max_interval)
+    store = ArticleStore(args.store_path)
+    companies_data = None    # 表示中の記事（重複除去の前）。新着のあった会社だけ読み直す
+    rendered_date = None
+    notices = {}             # 会社名 → 注意書き（取得できなかったソース。次に取得できるまで出す）
+
+    def render(metrics, force=False):
+        data = companies_data if args.no_dedup else dedupe_articles(companies_data, metrics, args.dedup_distance)
+        return write_digest(data, args, metrics, notices=notices, force=force)
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        # 取得を待たずに、ストアにある前回までの記事でページを出しておく
+        if store.last_rowid():
+            metrics = RunMetrics()
+            written = bool(args.archive_dir) and archive_days(store, args, metrics)
+            companies_data = load_articles(store, rss_sources, metrics, args.filters)
+            written = render(metrics) or written
+            rendered_date = datetime.now().date()
+            if written and on_render:
+                on_render()
+
+        while not stop.is_set():
+            metrics = RunMetrics()
+            due = schedule.due(plans)
+            changed = []
+            written = False          # この回に書き換えた出力があるか（あれば on_render を呼ぶ）
+            if due:
+                print(f"🔄 {datetime.now():%H:%M:%S} 取得: {len(due)} / {len(plans)} ソース")
+                due_plans = [plans[key] for key in due]
+                results, unavailable = fetcher.fetch(due_plans, metrics)
+                new_counts = ingest(store, results, metrics, args.filters, due_plans)
+                for key in due:
+                    new_items = sum(new_counts.get(name, 0) for name in plans[key].members)
+                    interval = schedule.record(key, new_items)
+                    if new_items:
+                        print(f"   🆕 {key}: {new_items} 件（次の取得まで {interval / 60:.0f} 分）")
+                schedule.save()
+                changed = [name for name, count in new_counts.items() if count]
+                previous = dict(notices)
+                for name in results:
+                    notices.pop(name, None)
+                notices.update(stale_notices(store, unavailable))
+                changed += [name for name in set(previous) | set(notices)
+                            if previous.get(name) != notices.get(name) and name not in changed]
+                if changed and args.search_index:
+                    written = update_search(store, args, metrics) or written
+
+            # 初回と日付が変わったとき（期間外の記事が落ち、格言も変わる）は全社を読み直す
+            today = datetime.now().date()
+            if companies_data is None or today != rendered_date:
+                if args.archive_dir:
+                    written = archive_days(store, args, metrics) or written
+                companies_data = load_articles(store, rss_sources, metrics, args.filters)
+                changed = list(companies_data)
+            elif changed:
+                companies_data.update(load_articles(store, changed, metrics, args.filters))
+
+            if changed:
+                # 日付が変わったときは記事が同じでも日付・格言・ストーリーを書き直す（ハッシュには含めていない）
+                rollover = rendered_date is not None and today != rendered_date
+                written = render(metrics, force=rollover) or written
+                rendered_date = today
+            if written and on_render:
+                on_render()
+            if due:
+                report_metrics(metrics, args)
+
+            wait = max(0.0, schedule.next_due(plans) - time.time())
+            print(f"💤 次の取得まで {wait / 60:.1f} 分")
+            stop.wait(wait)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        schedule.save()
+        store.close()
+        print("👋 常駐モードを終了しました")
+
+def run_serve(args):
+    """daemon として生成を続けながら、生成した内容をメモリから HTTP で配信する"""
+    server = DigestServer(args.host, args.port)
+
+    def publish():
+        extra = tuple(path for path in (args.search_index, args.archive_dir) if path)
+        resources = server.publish_site(".", SITE_PATHS + extra)
+        print(f"🌐 配信内容を差し替えました（{len(resources)} パス）")
+
+    publish()
+    server.start()
+    print(f"🌐 {server.base_url}/ で配信中")
+    try:
+        run_daemon(args, on_render=publish)
+    finally:
+        server.stop()
+
+def main(argv=None):
+    """メイン処理"""
+    args = parse_args(argv)
+    if args.command == "serve":
+        run_serve(args)
+    elif args.command == "daemon":
+        run_daemon(args)
+    else:
+        run_once(args)
+
 if __name__ == "__main__":
     main()
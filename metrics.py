@@ -0,0 +1,141 @@
+"""実行ごとの計測（段階ごとの時間とソースごとの取得結果）と、JSON / Prometheus 形式での書き出し"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from feed_cache import CACHE_DIR
+from fileio import write_atomic
+
+REPORT_PATH = os.path.join(CACHE_DIR, "run-report.json")
+PROMETHEUS_PATH = os.path.join(CACHE_DIR, "news_digest.prom")
+
+
+class SourceStats:
+    """1ソース分の取得結果（取得処理の中で直接書き換える）
+
+    ソースは取得計画の key（--batch-size でまとめた場合は「A+B+C」）で、記事の件数もまとめた会社の合計になる。
+    """
+
+    __slots__ = ("name", "status", "attempts", "fetch_seconds", "parse_seconds", "bytes_received",
+                 "entries_kept", "entries_dropped", "entries_new")
+
+    def __init__(self, name):
+        self.name = name
+        self.status = "pending"   # ok / not_modified / empty / failed / skipped / late
+        self.attempts = 0
+        self.fetch_seconds = 0.0
+        self.parse_seconds = 0.0
+        self.bytes_received = 0
+        self.entries_kept = 0
+        self.entries_dropped = 0
+        self.entries_new = 0
+
+    def as_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class RunMetrics:
+    """段階ごとの所要時間（入れ子になった段階の時間は親から差し引く）とソースごとの結果を集める"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.sources = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def source(self, name):
+        """ソースの SourceStats を返す（なければ作る）"""
+        with self.lock:
+            stats = self.sources.get(name)
+            if stats is None:
+                stats = self.sources[name] = SourceStats(name)
+            return stats
+
+    def count(self, name, value):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def stage(self, name):
+        """with ブロックの時間を name の段階として加算"""
+        stack = self.local.__dict__.setdefault("stack", [])
+        stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            children = stack.pop()
+            with self.lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed - children
+            if stack:
+                stack[-1] += elapsed
+
+    def timed(self, name, iterable):
+        """iterable から要素を取り出す時間を name の段階として加算（生成と書き込みを分けて測る）"""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def report(self):
+        return {
+            "started_at": self.started_at,
+            "duration_seconds": round(time.perf_counter() - self.started, 4),
+            "stages": {name: round(seconds, 4) for name, seconds in self.stages.items()},
+            "counters": dict(self.counters),
+            "sources": [stats.as_dict() for stats in self.sources.values()],
+        }
+
+    def slowest_sources(self, limit=5):
+        return sorted(self.sources.values(), key=lambda s: s.fetch_seconds, reverse=True)[:limit]
+
+    def write_json(self, path=REPORT_PATH):
+        write_atomic(path, json.dumps(self.report(), ensure_ascii=False, indent=2))
+
+    def write_prometheus(self, path=PROMETHEUS_PATH):
+        """node_exporter の textfile collector で読める形式で書き出す"""
+        report = self.report()
+        lines = []
+
+        def metric(name, help_text, samples, kind="gauge"):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        metric("news_digest_run_timestamp_seconds", "Start time of the last run.",
+               [({}, report["started_at"])])
+        metric("news_digest_run_duration_seconds", "Duration of the last run.",
+               [({}, report["duration_seconds"])])
+        metric("news_digest_stage_seconds", "Time spent in each stage of the last run.",
+               [({"stage": name}, seconds) for name, seconds in report["stages"].items()])
+        metric("news_digest_counter", "Counts from the last run.",
+               [({"name": name}, value) for name, value in report["counters"].items()])
+        sources = report["sources"]
+        metric("news_digest_source_fetch_seconds", "Time spent downloading each source.",
+               [({"source": s["name"], "status": s["status"]}, round(s["fetch_seconds"], 4)) for s in sources])
+        metric("news_digest_source_parse_seconds", "Time spent parsing each source.",
+               [({"source": s["name"]}, round(s["parse_seconds"], 4)) for s in sources])
+        metric("news_digest_source_bytes", "Bytes received for each source.",
+               [({"source": s["name"]}, s["bytes_received"]) for s in sources])
+        metric("news_digest_source_attempts", "Requests made for each source.",
+               [({"source": s["name"]}, s["attempts"]) for s in sources])
+        metric("news_digest_source_entries", "Entries kept, dropped by filters and newly stored per source.",
+               [({"source": s["name"], "result": result}, s[f"entries_{result}"])
+                for s in sources for result in ("kept", "dropped", "new")])
+        write_atomic(path, "\n".join(lines) + "\n")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
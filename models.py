@@ -0,0 +1,33 @@
+"""表示する記事のレコード（保存時の1回だけ日時の変換とエスケープを行う）"""
+import html
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+
+@dataclass(frozen=True, slots=True)
+class NewsItem:
+    guid: str              # 記事の識別子（guid がなければリンク）
+    title: str             # タイトル（エスケープ前）
+    link: str              # リンク（エスケープ前）
+    published: int         # 公開日時（UNIX 時刻、UTC）
+    published_at: datetime  # 公開日時（UTC、タイムゾーンなし）
+    sort_key: tuple        # 昇順に並べると新しい順になるキー
+    date_label: str        # 表示用の日付（MM/DD HH:MM）
+    title_html: str        # HTML 用にエスケープしたタイトル
+    link_html: str         # href 用にエスケープしたリンク
+
+    @classmethod
+    def create(cls, guid, title, link, published):
+        published = int(published)
+        published_at = datetime.fromtimestamp(published, timezone.utc).replace(tzinfo=None)
+        return cls(
+            guid=guid,
+            title=title,
+            link=link,
+            published=published,
+            published_at=published_at,
+            sort_key=(-published, guid),
+            date_label=published_at.strftime("%m/%d %H:%M"),
+            title_html=html.escape(title, quote=False),
+            link_html=html.escape(link),
+        )
@@ -0,0 +1,109 @@
+"""取得計画（Google ニュースの検索をまとめ、期間の指定をサーバー側に渡す）
+
+会社ごとの検索 URL をそのまま取得する代わりに、
+- 検索語に when:<日数>d を付けて、期間外の記事をサーバー側で除く（フィードが小さくなる）
+- batch_size 社ぶんの検索語を OR でつないで1回のリクエストにまとめる
+取得したフィードは、タイトルに各社の検索語（空白区切りの全単語）を含むかで会社ごとに分け直す。
+
+Google ニュースの検索結果は1フィード最大 100 件なので、まとめるほど1社あたりの件数は減り、
+本文だけに社名が出る記事はタイトルで照合できず落ちる。既定の batch_size は 1（まとめない）。
+"""
+from dataclasses import dataclass
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from keyword_filter import normalize
+
+SEARCH_PATH = "/rss/search"
+MAX_QUERY_LENGTH = 200   # まとめた検索語の最大文字数（長すぎる検索は Google 側で切られる）
+
+
+@dataclass(frozen=True, slots=True)
+class FetchPlan:
+    key: str          # 取得単位の名前（1社ならその会社名、まとめた場合は「A+B+C」）
+    url: str          # 取得する URL
+    members: tuple    # この取得で記事を得る会社名
+    terms: tuple      # 会社ごとの照合用の単語（normalize 済み、members と同じ並び）
+
+
+def search_query(url):
+    """Google ニュースの検索フィードの URL なら検索語を返す（それ以外は None）"""
+    parts = urlsplit(url)
+    if not parts.path.endswith(SEARCH_PATH):
+        return None
+    return dict(parse_qsl(parts.query)).get("q")
+
+
+def with_search_query(url, query):
+    """URL の検索語だけを置き換える（hl / gl / ceid などはそのまま）"""
+    parts = urlsplit(url)
+    params = [(key, query if key == "q" else value) for key, value in parse_qsl(parts.query, keep_blank_values=True)]
+    return urlunsplit(parts._replace(query=urlencode(params, safe=":")))
+
+
+def with_window(query, window_days):
+    """検索語に期間の指定を付ける（すでに when: があればそのまま）"""
+    if not window_days or "when:" in query:
+        return query
+    return f"{query} when:{window_days}d"
+
+
+def _or_term(query):
+    return f"({query})" if " " in query else query
+
+
+def plan_queries(sources, batch_size=1, window_days=None):
+    """会社名 → URL から取得計画のリストを作る（会社の並び順を保つ）
+
+    検索フィードでない URL と、同じホスト・パラメータの相手がいないものは1社ずつ取得する。
+    """
+    plans = []
+    groups = {}   # (検索語以外の URL) → まとめている最中の [(会社名, 検索語)]
+
+    def flush(group_key):
+        members = groups.pop(group_key)
+        names = tuple(name for name, _ in members)
+        queries = [query for _, query in members]
+        combined = queries[0] if len(queries) == 1 else " OR ".join(_or_term(query) for query in queries)
+        url = with_search_query(group_key, with_window(combined, window_days))
+        terms = tuple(tuple(normalize(word) for word in query.split()) for query in queries)
+        plans.append(FetchPlan("+".join(names), url, names, terms))
+
+    for name, url in sources.items():
+        query = search_query(url)
+        if query is None:
+            plans.append(FetchPlan(name, url, (name,), ()))
+            continue
+        group_key = with_search_query(url, "")
+        members = groups.setdefault(group_key, [])
+        length = sum(len(_or_term(q)) + 4 for _, q in members) + len(_or_term(query))
+        if members and (len(members) >= batch_size or length > MAX_QUERY_LENGTH):
+            flush(group_key)
+            members = groups.setdefault(group_key, [])
+        members.append((name, query))
+    for group_key in list(groups):
+        flush(group_key)
+
+    # 取得の順序は会社の並び順に合わせる（まとめたものは最初の会社の位置）
+    order = {name: i for i, name in enumerate(sources)}
+    return sorted(plans, key=lambda plan: order[plan.members[0]])
+
+
+def split_entries(plan, entries):
+    """1つの取得結果を会社ごとのエントリに分ける（1社だけならそのまま）"""
+    if len(plan.members) == 1:
+        return {plan.members[0]: list(entries)}
+    split = {name: [] for name in plan.members}
+    for entry in entries:
+        title = normalize(entry.get("title", ""))
+        for name, words in zip(plan.members, plan.terms):
+            if all(word in title for word in words):
+                split[name].append(entry)
+    return split
+
+
+def split_results(plans, results, names):
+    """取得計画ごとの結果（計画の key → エントリ）を会社名 → エントリに戻す（names の並び順）"""
+    companies = {}
+    for plan in plans:
+        companies.update(split_entries(plan, results.get(plan.key, [])))
+    return {name: companies.get(name, []) for name in names}
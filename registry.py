@@ -0,0 +1,86 @@
+"""会社の一覧（companies.json）を読み込み、名前・タブ ID で引ける不変の構造にする"""
+import json
+import os
+from dataclasses import dataclass
+from types import MappingProxyType
+from urllib.parse import quote_plus
+
+REGISTRY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "companies.json")
+
+# iter_tab_nav() が固定のタブ（すべて・格言・ストーリー）に使うショートカット
+RESERVED_SHORTCUTS = frozenset({"1", "5", "6"})
+
+GOOGLE_NEWS_URL = "https://news.google.com/rss/search?q={query}&hl=ja&gl=JP&ceid=JP:ja"
+
+
+def google_news_url(query):
+    """Google News の検索フィードの URL"""
+    return GOOGLE_NEWS_URL.format(query=quote_plus(query))
+
+
+@dataclass(frozen=True, slots=True)
+class Company:
+    name: str        # 表示名（記事の保存やフィルタ設定のキーにもなる）
+    query: str       # Google News の検索語
+    url: str         # フィードの URL（省略時は query から作る）
+    tab_id: str      # タブ・シャードの ID
+    icon: str        # セクション見出しのアイコン
+    emoji: str       # タブボタンの絵文字
+    shortcut: str    # Alt + このキーでタブを開く（なければ空文字）
+
+
+class Registry:
+    """会社の並び順を保ったまま、名前とタブ ID で引けるようにしたもの"""
+
+    __slots__ = ("companies", "by_name", "by_tab_id")
+
+    def __init__(self, companies):
+        self.companies = tuple(companies)
+        by_name, by_tab_id, shortcuts = {}, {}, set()
+        for company in self.companies:
+            if company.name in by_name:
+                raise ValueError(f"会社名が重複しています: {company.name}")
+            if company.tab_id in by_tab_id:
+                raise ValueError(f"タブ ID が重複しています: {company.tab_id}")
+            if company.shortcut and company.shortcut in shortcuts:
+                raise ValueError(f"ショートカットが重複しています: {company.shortcut}")
+            if company.shortcut in RESERVED_SHORTCUTS:
+                raise ValueError(f"ショートカット {company.shortcut} は固定のタブで使っています: {company.name}")
+            by_name[company.name] = company
+            by_tab_id[company.tab_id] = company
+            shortcuts.add(company.shortcut)
+        self.by_name = MappingProxyType(by_name)
+        self.by_tab_id = MappingProxyType(by_tab_id)
+
+    def __iter__(self):
+        return iter(self.companies)
+
+    def __len__(self):
+        return len(self.companies)
+
+    def get(self, name):
+        return self.by_name.get(name)
+
+    def sources(self):
+        """会社名 → フィード URL（取得処理に渡す形）"""
+        return {company.name: company.url for company in self.companies}
+
+
+def make_company(name, query=None, url=None, tab_id=None, icon=None, emoji="📰", shortcut=""):
+    """省略された項目を補って Company を作る"""
+    query = query or name
+    return Company(
+        name=name,
+        query=query,
+        url=url or google_news_url(query),
+        tab_id=tab_id or name.lower(),
+        icon=icon or name[:2],
+        emoji=emoji,
+        shortcut=shortcut,
+    )
+
+
+def load_registry(path=REGISTRY_PATH):
+    """companies.json を読み込む（ファイルの並び順がタブの並び順になる）"""
+    with open(path, encoding="utf-8") as f:
+        return Registry(make_company(**entry) for entry in json.load(f))
@@ -0,0 +1,74 @@
+"""常駐モードの取得間隔（ソースごとに、新着が出る頻度に合わせて伸び縮みさせる）"""
+import json
+import os
+import random
+import time
+
+from feed_cache import CACHE_DIR
+from fileio import write_atomic
+
+SCHEDULE_PATH = os.path.join(CACHE_DIR, "schedule.json")
+
+MIN_INTERVAL = 10 * 60        # 取得間隔の下限（秒）
+MAX_INTERVAL = 6 * 3600       # 取得間隔の上限（秒）
+INITIAL_INTERVAL = 60 * 60    # 初めて見るソースの取得間隔（秒）
+SHRINK = 0.5                  # 新着があったときの倍率
+GROW = 1.5                    # 新着がなかったときの倍率
+JITTER = 0.1                  # 次回の時刻をずらす割合（同じホストへの取得が重ならないように）
+
+
+class PollSchedule:
+    """ソースごとの取得間隔と次回の取得時刻（状態は再起動をまたいで保存）
+
+    新着があれば間隔を SHRINK 倍に縮め、なければ GROW 倍に延ばす（MIN_INTERVAL〜MAX_INTERVAL）。
+    よく記事が出るソース（ソフトバンクなど）は短い間隔に、めったに出ないソースは長い間隔に落ち着く。
+    """
+
+    def __init__(self, path=SCHEDULE_PATH, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL,
+                 initial_interval=INITIAL_INTERVAL):
+        self.path = path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.initial_interval = min(max(initial_interval, min_interval), max_interval)
+        self.data = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.data = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"⚠️  取得間隔の状態を読み込めません（リセットします）: {e}")
+
+    def interval(self, source):
+        return self.data.get(source, {}).get("interval", self.initial_interval)
+
+    def next_at(self, source):
+        """次に取得する時刻（初めて見るソースは 0 = すぐ）"""
+        return self.data.get(source, {}).get("next_at", 0)
+
+    def due(self, sources, now=None):
+        """取得する時刻になったソースを並び順のまま返す
+
+        ジッターで少しずつずれた時刻を1回の取得にまとめるため、下限間隔の JITTER 倍以内に来るものも含める。
+        """
+        now = time.time() if now is None else now
+        return [source for source in sources if self.next_at(source) <= now + self.min_interval * JITTER]
+
+    def next_due(self, sources):
+        """次にどれかのソースを取得する時刻"""
+        return min((self.next_at(source) for source in sources), default=time.time() + self.max_interval)
+
+    def record(self, source, new_items, now=None):
+        """取得結果（新着件数）から間隔を調整し、次回の時刻を決める"""
+        now = time.time() if now is None else now
+        interval = self.interval(source) * (SHRINK if new_items else GROW)
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        self.data[source] = {
+            "interval": interval,
+            "next_at": now + interval * random.uniform(1 - JITTER, 1 + JITTER),
+            "last_new": new_items,
+        }
+        return interval
+
+    def save(self):
+        write_atomic(self.path, json.dumps(self.data, ensure_ascii=False))
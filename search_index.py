@@ -0,0 +1,147 @@
+"""見出しの全文検索用の索引（文字バイグラムの転置索引。ページと同じ場所に JSON で書き出す）
+
+日本語は単語の区切りがないので、正規化したタイトルの連続する2文字を索引語にする。
+ブラウザは検索語のバイグラムの転置リストを突き合わせて候補を絞り、最後に部分一致で確かめる。
+
+索引は前回の JSON を読み込み、期間外になった記事を除いて、前回より後にストアに追加された記事
+（rowid が大きいもの）だけを足す。毎回ストア全体から作り直さない。
+"""
+import json
+import re
+
+from fileio import write_atomic
+from keyword_filter import normalize
+
+SEARCH_INDEX_PATH = "search.json"
+INDEX_VERSION = 1
+
+_NON_WORD = re.compile(r"[\W_]+")   # ブラウザ側の /[^\p{L}\p{N}]+/gu と同じく文字と数字だけを残す
+
+
+def compact(text):
+    """NFKC 正規化・大文字小文字の統一をして、記号と空白を除く"""
+    return _NON_WORD.sub("", normalize(text))
+
+
+def bigrams(text):
+    text = compact(text)
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class SearchIndex:
+    """記事（ストアの rowid を ID にする）とバイグラム → 記事 ID の転置リスト"""
+
+    def __init__(self):
+        self.companies = []    # 会社名（記事は添字で参照する）
+        self.docs = {}         # 記事 ID → [会社の添字, タイトル, リンク, 公開日時]
+        self.postings = {}     # バイグラム → 記事 ID（昇順）
+        self.last_rowid = 0    # 索引に入れた最後の rowid
+
+    @classmethod
+    def load(cls, path=SEARCH_INDEX_PATH):
+        """前回の索引を読み込む（ない・読めない・形式が違う場合は空の索引）"""
+        index = cls()
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return index
+        except (OSError, ValueError) as e:
+            print(f"⚠️  検索索引を読み込めません（作り直します）: {e}")
+            return index
+        if data.get("version") != INDEX_VERSION:
+            return index
+        index.companies = data["companies"]
+        index.docs = {int(doc_id): doc for doc_id, doc in data["docs"].items()}
+        for gram, gaps in data["postings"].items():
+            ids, last = [], 0
+            for gap in gaps:
+                last += gap
+                ids.append(last)
+            index.postings[gram] = ids
+        index.last_rowid = data["last_rowid"]
+        return index
+
+    def expire(self, since):
+        """since（UNIX 時刻）より前に公開された記事を除き、除いた件数を返す"""
+        return self._remove({doc_id for doc_id, doc in self.docs.items() if doc[3] < since})
+
+    def drop_filtered(self, filters):
+        """filters（会社名 → KeywordFilter）で除外される記事を除き、除いた件数を返す（後から足したルールにも合わせる）"""
+        return self._remove({doc_id for doc_id, doc in self.docs.items()
+                             if not _keep(filters, self.companies[doc[0]], doc[1])})
+
+    def _remove(self, doc_ids):
+        if not doc_ids:
+            return 0
+        for doc_id in doc_ids:
+            del self.docs[doc_id]
+        for gram in list(self.postings):
+            ids = [doc_id for doc_id in self.postings[gram] if doc_id not in doc_ids]
+            if ids:
+                self.postings[gram] = ids
+            else:
+                del self.postings[gram]
+        return len(doc_ids)
+
+    def add(self, rowid, company, item):
+        """記事を追加（rowid は増えていく順に渡す）"""
+        if company not in self.companies:
+            self.companies.append(company)
+        self.docs[rowid] = [self.companies.index(company), item.title, item.link, item.published]
+        for gram in bigrams(item.title):
+            self.postings.setdefault(gram, []).append(rowid)
+        self.last_rowid = max(self.last_rowid, rowid)
+
+    def to_json(self):
+        """転置リストは差分（前の ID との差）で持ち、JSON を小さくする"""
+        postings = {}
+        for gram in sorted(self.postings):
+            ids = self.postings[gram]
+            postings[gram] = [ids[0]] + [b - a for a, b in zip(ids, ids[1:])]
+        data = {
+            "version": INDEX_VERSION,
+            "last_rowid": self.last_rowid,
+            "companies": self.companies,
+            "docs": {str(doc_id): doc for doc_id, doc in sorted(self.docs.items())},
+            "postings": postings,
+        }
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+    def save(self, path=SEARCH_INDEX_PATH):
+        """内容が変わったときだけ書き出し、書き出したかを返す"""
+        content = self.to_json()
+        try:
+            with open(path, encoding="utf-8") as f:
+                if f.read() == content:
+                    return False
+        except FileNotFoundError:
+            pass
+        write_atomic(path, content)
+        return True
+
+
+def _keep(filters, company, title):
+    rules = filters.get(company)
+    return rules.keep(title) if rules else True
+
+
+def update_search_index(store, since, path=SEARCH_INDEX_PATH, filters=None):
+    """前回の索引に新しく保存された記事だけを足して書き出す。(追加件数, 削除件数, 書き出したか) を返す
+
+    filters（会社名 → KeywordFilter）で除外される記事は、ページと同じく索引にも入れない。
+    """
+    filters = filters or {}
+    index = SearchIndex.load(path)
+    if index.last_rowid > store.last_rowid():
+        # ストアが作り直されている（rowid が巻き戻った）ので索引も作り直す
+        index = SearchIndex()
+    removed = index.expire(since) + index.drop_filtered(filters)
+    added = 0
+    for rowid, company, item in store.added_since(index.last_rowid, since):
+        if _keep(filters, company, item.title):
+            index.add(rowid, company, item)
+            added += 1
+        else:
+            index.last_rowid = max(index.last_rowid, rowid)
+    return added, removed, index.save(path)
@@ -0,0 +1,82 @@
+"""取得したフィードの記録と再生（--record / --replay）
+
+--record では取得した応答（ステータス・ヘッダー・本文のバイト列）を URL ごとに1つの gzip 圧縮した JSON に保存し、
+--replay ではネットワークに接続せず、保存した応答を fetcher.download() の代わりに返す。
+フィルタやテンプレートを直すときに、毎回 Google ニュースから取り直さずに同じ入力で生成し直せる。
+
+本文は UTF-8 として読めればそのまま文字列で、読めなければ base64 で保存する。
+"""
+import base64
+import gzip
+import json
+import threading
+import time
+
+from fetcher import Response
+from fileio import write_atomic
+
+SNAPSHOT_VERSION = 1
+
+
+class SnapshotMiss(LookupError):
+    """再生するスナップショットに URL の応答がない"""
+
+
+def _encode_body(body):
+    try:
+        return {"body": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_b64": base64.b64encode(body).decode("ascii")}
+
+
+def _decode_body(record):
+    if "body_b64" in record:
+        return base64.b64decode(record["body_b64"])
+    return record["body"].encode("utf-8")
+
+
+class SnapshotRecorder:
+    """download() を包んで、取得した応答を URL ごとに記録する（ワーカースレッドから呼ばれる）"""
+
+    def __init__(self, path):
+        self.path = path
+        self.responses = {}
+        self.lock = threading.Lock()
+
+    def wrap(self, download):
+        def recording_download(url, etag=None, modified=None, **kwargs):
+            response = download(url, etag=etag, modified=modified, **kwargs)
+            record = {"status": response.status, "headers": response.headers, **_encode_body(response.body)}
+            with self.lock:
+                self.responses[url] = record
+            return response
+        return recording_download
+
+    def save(self):
+        """記録した応答を書き出し、件数を返す"""
+        data = {"version": SNAPSHOT_VERSION, "recorded_at": time.time(), "responses": self.responses}
+        content = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        write_atomic(self.path, gzip.compress(content))
+        return len(self.responses)
+
+
+class SnapshotReplay:
+    """記録した応答を返す download() の代わり（ETag などの条件は無視して、記録した応答をそのまま返す）"""
+
+    def __init__(self, responses, recorded_at):
+        self.responses = responses
+        self.recorded_at = recorded_at
+
+    @classmethod
+    def load(cls, path):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"スナップショットの形式が違います: {path}")
+        return cls(data["responses"], data["recorded_at"])
+
+    def download(self, url, etag=None, modified=None, timeout=None, deadline=None):
+        record = self.responses.get(url)
+        if record is None:
+            raise SnapshotMiss(f"スナップショットにありません: {url}")
+        return Response(record["status"], record["headers"], _decode_body(record))
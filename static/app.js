@@ -0,0 +1,67 @@
+// タブ切り替え機能
+document.addEventListener('DOMContentLoaded', function() {
+    const tabButtons = document.querySelectorAll('.tab-button');
+    const tabContents = document.querySelectorAll('.tab-content');
+
+    tabButtons.forEach(button => {
+        button.addEventListener('click', function() {
+            const targetTab = this.getAttribute('data-tab');
+
+            // アクティブ状態をリセット
+            tabButtons.forEach(btn => btn.classList.remove('active'));
+            tabContents.forEach(content => content.classList.remove('active'));
+
+            // 新しいアクティブ状態を設定
+            this.classList.add('active');
+            const targetContent = document.getElementById(targetTab) || document.getElementById('all');
+            targetContent.classList.add('active');
+
+            // 個別企業タブがない場合は「すべて」のセクションを会社ごとに絞り込む
+            document.querySelectorAll('#all > .news-section').forEach(section => {
+                section.hidden = targetTab !== 'all' && section.dataset.tab !== targetTab;
+            });
+        });
+    });
+
+    // スクロールアニメーション
+    const observerOptions = {
+        threshold: 0.1,
+        rootMargin: '0px 0px -100px 0px'
+    };
+
+    const observer = new IntersectionObserver(function(entries) {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                entry.target.classList.add('visible');
+            }
+        });
+    }, observerOptions);
+
+    // スクロールフェード要素を監視
+    document.querySelectorAll('.scroll-fade').forEach(el => {
+        observer.observe(el);
+    });
+
+    // ニュースアイテムにホバーエフェクト
+    document.querySelectorAll('.news-item').forEach(item => {
+        item.addEventListener('mouseenter', function() {
+            this.style.transform = 'translateX(10px)';
+        });
+
+        item.addEventListener('mouseleave', function() {
+            this.style.transform = 'translateX(0)';
+        });
+    });
+
+    // キーボードショートカット（Alt + キー。キーはタブボタンの data-shortcut に出力してある）
+    document.addEventListener('keydown', function(e) {
+        if (!e.altKey) {
+            return;
+        }
+        const button = document.querySelector('.tab-button[data-shortcut="' + CSS.escape(e.key) + '"]');
+        if (button) {
+            e.preventDefault();
+            button.click();
+        }
+    });
+});
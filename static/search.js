@@ -0,0 +1,138 @@
+// 見出しの全文検索（search.json の文字バイグラム索引を、検索欄を使うときに読み込む）
+document.addEventListener('DOMContentLoaded', function() {
+    const input = document.getElementById('search-input');
+    const results = document.getElementById('search-results');
+    const tabs = document.querySelector('.tab-container');
+    if (!input || !results) {
+        return;
+    }
+    const MAX_RESULTS = 50;
+    let index = null;
+    let loading = null;
+    let timer = null;
+
+    // search_index.compact() と同じ正規化（NFKC・小文字化・文字と数字以外を除く）
+    function compact(text) {
+        return text.normalize('NFKC').toLowerCase().replace(/[^\p{L}\p{N}]+/gu, '');
+    }
+
+    // search_index.bigrams() と同じくコードポイント単位で区切る（𠮷 などのサロゲートペアを分けない）
+    function bigrams(text) {
+        const chars = Array.from(text);
+        const grams = new Set();
+        for (let i = 0; i < chars.length - 1; i++) {
+            grams.add(chars[i] + chars[i + 1]);
+        }
+        return Array.from(grams);
+    }
+
+    function load() {
+        if (!loading) {
+            loading = fetch(input.dataset.index, { cache: 'no-cache' })
+                .then(response => response.json())
+                .then(data => {
+                    // 転置リストは前の ID との差で保存されている
+                    const postings = {};
+                    Object.entries(data.postings).forEach(([gram, gaps]) => {
+                        let last = 0;
+                        postings[gram] = gaps.map(gap => (last += gap));
+                    });
+                    index = { companies: data.companies, docs: data.docs, postings: postings };
+                })
+                .catch(() => { loading = null; });
+        }
+        return loading;
+    }
+
+    function intersect(a, b) {
+        const result = [];
+        let i = 0;
+        let j = 0;
+        while (i < a.length && j < b.length) {
+            if (a[i] === b[j]) {
+                result.push(a[i]);
+                i++;
+                j++;
+            } else if (a[i] < b[j]) {
+                i++;
+            } else {
+                j++;
+            }
+        }
+        return result;
+    }
+
+    function search(query) {
+        const needle = compact(query);
+        const grams = bigrams(needle);
+        let candidates;
+        if (grams.length === 0) {
+            candidates = Object.keys(index.docs).map(Number);
+        } else {
+            const lists = grams.map(gram => index.postings[gram] || []);
+            lists.sort((a, b) => a.length - b.length);
+            candidates = lists.reduce(intersect);
+        }
+        // バイグラムが揃っていても並びが違うことがあるので、部分一致で確かめる
+        return candidates
+            .map(id => index.docs[id])
+            .filter(doc => compact(doc[1]).includes(needle))
+            .sort((a, b) => b[3] - a[3]);
+    }
+
+    function formatDate(published) {
+        const date = new Date(published * 1000);
+        const pad = value => String(value).padStart(2, '0');
+        return `${pad(date.getUTCMonth() + 1)}/${pad(date.getUTCDate())} ${pad(date.getUTCHours())}:${pad(date.getUTCMinutes())}`;
+    }
+
+    function render(query, docs) {
+        const heading = document.createElement('h2');
+        heading.textContent = `🔍 「${query}」の検索結果 ${docs.length} 件`;
+        const list = document.createElement('ul');
+        list.className = 'news-list';
+        docs.slice(0, MAX_RESULTS).forEach(([company, title, link, published]) => {
+            const item = document.createElement('li');
+            item.className = 'news-item';
+            const anchor = document.createElement('a');
+            anchor.href = link;
+            anchor.target = '_blank';
+            anchor.textContent = title;
+            const dateElement = document.createElement('div');
+            dateElement.className = 'news-date';
+            dateElement.textContent = `${index.companies[company]} ・ ${formatDate(published)}`;
+            item.append(anchor, dateElement);
+            list.appendChild(item);
+        });
+        results.replaceChildren(heading, list);
+    }
+
+    function update() {
+        const query = input.value.trim();
+        if (!query) {
+            results.hidden = true;
+            tabs.hidden = false;
+            return;
+        }
+        load().then(() => {
+            if (!index || input.value.trim() !== query) {
+                return;
+            }
+            render(query, search(query));
+            results.hidden = false;
+            tabs.hidden = true;
+        });
+    }
+
+    input.addEventListener('focus', load);
+    input.addEventListener('input', function() {
+        clearTimeout(timer);
+        timer = setTimeout(update, 150);
+    });
+    input.addEventListener('keydown', function(e) {
+        if (e.key === 'Escape') {
+            input.value = '';
+            update();
+        }
+    });
+});
@@ -0,0 +1,110 @@
+// 会社ごとの JSON シャードを読み込んで表示（--render-mode shards のページ用）
+document.addEventListener('DOMContentLoaded', function() {
+    const container = document.getElementById('all');
+    const baseUrl = container.dataset.shards;
+    const tabIds = Array.from(document.querySelectorAll('.tab-button'))
+        .map(button => button.getAttribute('data-tab'))
+        .filter(tabId => !['all', 'quote', 'story'].includes(tabId));
+    const sections = {};
+    const requests = {};
+
+    function activeTab() {
+        const button = document.querySelector('.tab-button.active');
+        return button ? button.getAttribute('data-tab') : 'all';
+    }
+
+    // 並び順を保つため、セクションの枠を先に作っておく
+    tabIds.forEach(tabId => {
+        const section = document.createElement('div');
+        section.className = 'news-section';
+        section.dataset.tab = tabId;
+        section.hidden = activeTab() !== 'all' && activeTab() !== tabId;
+        container.appendChild(section);
+        sections[tabId] = section;
+    });
+
+    function renderShard(tabId, shard) {
+        const section = sections[tabId];
+        const heading = document.createElement('h2');
+        const icon = document.createElement('div');
+        icon.className = 'company-icon';
+        icon.textContent = shard.icon;
+        heading.append(icon, shard.company + ' 最新ニュース');
+
+        const children = [heading];
+        if (shard.notice) {
+            const notice = document.createElement('div');
+            notice.className = 'news-notice';
+            notice.textContent = shard.notice;
+            children.push(notice);
+        }
+
+        const list = document.createElement('ul');
+        list.className = 'news-list';
+        if (shard.items.length === 0) {
+            const item = document.createElement('li');
+            item.className = 'news-item';
+            item.innerHTML = "<div style='color: #e74c3c; font-style: italic;'>現在ニュースを取得できません。後ほど再度お試しください。</div>";
+            list.appendChild(item);
+        }
+        shard.items.forEach(([title, link, date]) => {
+            const item = document.createElement('li');
+            item.className = 'news-item';
+            const anchor = document.createElement('a');
+            anchor.href = link;
+            anchor.target = '_blank';
+            anchor.textContent = title;
+            item.appendChild(anchor);
+            if (date) {
+                const dateElement = document.createElement('div');
+                dateElement.className = 'news-date';
+                dateElement.textContent = date;
+                item.appendChild(dateElement);
+            }
+            item.addEventListener('mouseenter', function() {
+                this.style.transform = 'translateX(10px)';
+            });
+            item.addEventListener('mouseleave', function() {
+                this.style.transform = 'translateX(0)';
+            });
+            list.appendChild(item);
+        });
+        children.push(list);
+        section.replaceChildren(...children);
+    }
+
+    function loadShard(tabId) {
+        if (!requests[tabId]) {
+            requests[tabId] = fetch(baseUrl + tabId + '.json', { cache: 'no-cache' })
+                .then(response => response.json())
+                .then(shard => renderShard(tabId, shard))
+                .catch(() => { delete requests[tabId]; });
+        }
+        return requests[tabId];
+    }
+
+    // 「すべて」タブは数件ずつ順番に読み込む
+    function loadAll(concurrency) {
+        let next = 0;
+        function worker() {
+            if (next >= tabIds.length) return Promise.resolve();
+            return loadShard(tabIds[next++]).then(worker);
+        }
+        for (let i = 0; i < concurrency; i++) worker();
+    }
+
+    document.querySelectorAll('.tab-button').forEach(button => {
+        button.addEventListener('click', function() {
+            const tabId = this.getAttribute('data-tab');
+            if (tabId === 'all') {
+                loadAll(4);
+            } else if (sections[tabId]) {
+                loadShard(tabId);
+            }
+        });
+    });
+
+    if (activeTab() === 'all') {
+        loadAll(4);
+    }
+});
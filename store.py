@@ -0,0 +1,126 @@
+"""記事の保存先（SQLite）。取得した記事を追記し、表示用の記事は期間指定のクエリで取り出す"""
+import calendar
+import os
+import sqlite3
+import threading
+import time
+
+from feed_cache import CACHE_DIR
+from models import NewsItem
+
+STORE_PATH = os.path.join(CACHE_DIR, "news.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    company    TEXT NOT NULL,
+    guid       TEXT NOT NULL,
+    title      TEXT NOT NULL,
+    link       TEXT NOT NULL,
+    published  INTEGER NOT NULL,  -- 公開日時（UNIX 時刻、UTC）
+    fetched_at INTEGER NOT NULL,  -- 初めて取得した日時（UNIX 時刻）
+    PRIMARY KEY (company, guid)
+);
+CREATE INDEX IF NOT EXISTS articles_company_published ON articles (company, published DESC);
+CREATE INDEX IF NOT EXISTS articles_published ON articles (published);
+CREATE INDEX IF NOT EXISTS articles_fetched_at ON articles (fetched_at);
+CREATE TABLE IF NOT EXISTS sources (
+    company      TEXT PRIMARY KEY,
+    refreshed_at INTEGER NOT NULL  -- 最後に取得に成功した日時（UNIX 時刻）
+);
+"""
+
+
+def entry_guid(entry):
+    """記事の識別子（guid がなければリンク）"""
+    return entry.get("id") or entry.get("link")
+
+
+class ArticleStore:
+    """会社・記事ごとに1行で記事を保存する SQLite ストア"""
+
+    def __init__(self, path=STORE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+
+    def upsert(self, company, entries):
+        """まだ保存していない記事だけを追加し、追加した件数を返す"""
+        now = int(time.time())
+        rows = [
+            (company, entry_guid(entry), entry.get("title", "タイトルなし"), entry.get("link", "#"),
+             calendar.timegm(entry.published_parsed), now)
+            for entry in entries
+            if entry.get("published_parsed") and entry_guid(entry)
+        ]
+        with self.lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT INTO articles (company, guid, title, link, published, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT DO NOTHING",
+                rows,
+            )
+            return self.conn.total_changes - before
+
+    def recent(self, company, since, limit=10):
+        """since（UNIX 時刻）以降の記事を新しい順に最大 limit 件（None なら全件）、NewsItem で返す"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT guid, title, link, published FROM articles"
+                " WHERE company = ? AND published >= ? ORDER BY published DESC LIMIT ?",
+                (company, int(since), -1 if limit is None else limit),
+            ).fetchall()
+        return [NewsItem.create(guid, title, link, published) for guid, title, link, published in rows]
+
+    def added_since(self, rowid, since):
+        """rowid より後に追加した記事のうち since（UNIX 時刻）以降に公開されたものを (rowid, 会社名, NewsItem) で返す"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT rowid, company, guid, title, link, published FROM articles"
+                " WHERE rowid > ? AND published >= ? ORDER BY rowid",
+                (rowid, int(since)),
+            ).fetchall()
+        return [(row[0], row[1], NewsItem.create(*row[2:])) for row in rows]
+
+    def fetched_between(self, start, end):
+        """start 以上 end 未満（UNIX 時刻）に初めて取得した記事を (会社名, NewsItem) で、公開日時の新しい順に返す"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT company, guid, title, link, published FROM articles"
+                " WHERE fetched_at >= ? AND fetched_at < ? ORDER BY published DESC",
+                (int(start), int(end)),
+            ).fetchall()
+        return [(row[0], NewsItem.create(*row[1:])) for row in rows]
+
+    def first_fetched_at(self):
+        """最初に記事を取得した日時（空なら None）"""
+        with self.lock:
+            return self.conn.execute("SELECT min(fetched_at) FROM articles").fetchone()[0]
+
+    def mark_refreshed(self, companies, now=None):
+        """取得に成功した（ストアの記事がその時点で最新になった）会社を記録する"""
+        now = int(time.time() if now is None else now)
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO sources (company, refreshed_at) VALUES (?, ?)"
+                " ON CONFLICT (company) DO UPDATE SET refreshed_at = excluded.refreshed_at",
+                [(company, now) for company in companies],
+            )
+
+    def refreshed_at(self, companies):
+        """会社名 → 最後に取得に成功した日時（記録がない会社は含めない）"""
+        companies = list(companies)
+        placeholders = ", ".join("?" * len(companies))
+        with self.lock:
+            return dict(self.conn.execute(
+                f"SELECT company, refreshed_at FROM sources WHERE company IN ({placeholders})", companies))
+
+    def last_rowid(self):
+        """最後に追加した記事の rowid（空なら 0）"""
+        with self.lock:
+            return self.conn.execute("SELECT coalesce(max(rowid), 0) FROM articles").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
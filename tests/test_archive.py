@@ -0,0 +1,70 @@
+"""日ごとのアーカイブ（archive）のテスト"""
+import os
+import re
+from datetime import date, datetime, timedelta
+from datetime import time as dtime
+
+import archive
+from keyword_filter import KeywordFilter
+from models import NewsItem
+
+
+class DayStore:
+    """1日1件ずつ記事を取得したことにするストア（update_archive が使うメソッドだけ）"""
+
+    def __init__(self, first_day, title="{day} の記事"):
+        self.first_day = first_day
+        self.title = title
+
+    def first_fetched_at(self):
+        return datetime.combine(self.first_day, dtime()).timestamp()
+
+    def fetched_between(self, start, end):
+        day = date.fromtimestamp(start)
+        if day < self.first_day:
+            return []
+        item = NewsItem.create(day.isoformat(), self.title.format(day=day), f"https://example.com/{day}", start)
+        return [("ソフトバンク", item)]
+
+
+def test_update_archive_applies_filters(tmp_path):
+    today = date(2026, 10, 18)
+    store = DayStore(today - timedelta(days=2), title="ホークス {day}")
+    filters = {"ソフトバンク": KeywordFilter(exclude=["ホークス"])}
+    assert archive.update_archive(store, ["ソフトバンク"], today=today, archive_dir=str(tmp_path),
+                                  filters=filters) == []
+    assert os.listdir(tmp_path) == ["index.html"]
+
+
+def _listing_days(path):
+    with open(path, encoding="utf-8") as f:
+        content = f.read()
+    return sorted(date.fromisoformat(day) for day in re.findall(r"href='(\d{4}-\d{2}-\d{2})\.html'", content))
+
+
+def test_update_archive_paginates(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive, "PAGE_SIZE", 3)
+    archive_dir = str(tmp_path)
+    today = date(2026, 10, 18)
+    store = DayStore(today - timedelta(days=7))
+
+    added = archive.update_archive(store, ["ソフトバンク"], today=today, archive_dir=archive_dir)
+    assert added == [today - timedelta(days=n) for n in range(7, 0, -1)]
+    assert sorted(os.listdir(archive_dir)) == sorted(
+        [archive.day_filename(day) for day in added]
+        + [archive.page_filename(1), archive.page_filename(2), "index.html"])
+    assert _listing_days(tmp_path / archive.page_filename(1)) == added[:3]
+    assert _listing_days(tmp_path / archive.page_filename(2)) == added[3:6]
+    assert _listing_days(tmp_path / "index.html") == added[6:]
+    assert f"href='{archive.page_filename(2)}'" in (tmp_path / archive.page_filename(1)).read_text(encoding="utf-8")
+    assert "それより後" not in (tmp_path / archive.page_filename(2)).read_text(encoding="utf-8")
+
+    # 書き出し済みの日は作り直さず、続きの日だけ追加する
+    assert archive.update_archive(store, ["ソフトバンク"], today=today, archive_dir=archive_dir) == []
+    later = today + timedelta(days=2)
+    added_later = archive.update_archive(store, ["ソフトバンク"], today=later, archive_dir=archive_dir)
+    assert added_later == [today, today + timedelta(days=1)]
+    assert _listing_days(tmp_path / archive.page_filename(3)) == [added[6], *added_later]
+    assert _listing_days(tmp_path / "index.html") == []
+    # それまで最後だったページに、新しく埋まったページへのリンクが付く
+    assert f"href='{archive.page_filename(3)}'" in (tmp_path / archive.page_filename(2)).read_text(encoding="utf-8")
@@ -0,0 +1,34 @@
+"""サーキットブレーカー（breaker）のテスト"""
+import time
+
+from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def test_circuit_breaker_transitions(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: clock[0])
+    breaker = CircuitBreaker(tmp_path / "breakers.json", failure_threshold=2, cooldown=60, max_cooldown=100)
+
+    assert breaker.allow("A") and breaker.state("A") == CLOSED
+    breaker.record_failure("A")
+    assert breaker.state("A") == CLOSED and breaker.failures("A") == 1
+    breaker.record_failure("A")
+    assert breaker.state("A") == OPEN
+    assert not breaker.allow("A")
+
+    # クールダウンが明けたら1回だけ試す。失敗すればクールダウンを2倍（上限まで）にして open に戻る
+    clock[0] += 60
+    assert breaker.allow("A") and breaker.state("A") == HALF_OPEN
+    breaker.record_failure("A")
+    assert breaker.state("A") == OPEN
+    clock[0] += 99
+    assert not breaker.allow("A")
+    clock[0] += 1
+    assert breaker.allow("A")
+    breaker.record_success("A")
+    assert breaker.state("A") == CLOSED and breaker.failures("A") == 0
+
+    # 状態は保存して次の実行に引き継ぐ
+    breaker.record_failure("B")
+    breaker.save()
+    assert CircuitBreaker(tmp_path / "breakers.json").failures("B") == 1
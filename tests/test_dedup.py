@@ -0,0 +1,60 @@
+"""重複排除（dedup）のテスト"""
+import pytest
+
+from dedup import SimHashIndex, dedupe, normalize_title, simhash
+from models import NewsItem
+
+
+def _item(guid, title, published=1_760_000_000):
+    return NewsItem.create(guid, title, f"https://example.com/{guid}", published)
+
+
+def test_normalize_title_drops_source_and_symbols():
+    assert normalize_title("ＰａｙＰａｙ、新サービスを発表！ - 日本経済新聞") == "paypay新サービスを発表"
+    assert normalize_title("電通 - 博報堂 決算 - ロイター") == "電通博報堂決算"
+
+
+def test_simhash_is_stable_and_close_for_similar_titles():
+    a = simhash(normalize_title("ソフトバンク、AI新会社を設立 来年から営業開始 - 日経"))
+    b = simhash(normalize_title("ソフトバンク、AI新会社を設立 来年から営業開始へ - ロイター"))
+    c = simhash(normalize_title("トヨタ、新型EVを発表 航続距離は600km"))
+    assert a == simhash(normalize_title("ソフトバンク、AI新会社を設立 来年から営業開始"))
+    assert (a ^ b).bit_count() < (a ^ c).bit_count()
+
+
+@pytest.mark.parametrize("bits, found", [
+    ((), True),
+    ((0,), True),
+    ((0, 20, 63), True),       # 別々の帯で3ビット違っても、残りの帯が一致する
+    ((60, 61, 62), True),      # 同じ帯で3ビット違う
+    ((0, 20, 40, 63), False),  # 4ビット違えば別の記事
+])
+def test_simhash_index_finds_within_max_distance(bits, found):
+    value = 0x0123456789ABCDEF
+    index = SimHashIndex(max_distance=3)
+    index.add(value)
+    for bit in bits:
+        value ^= 1 << bit
+    assert index.find(value) is found
+
+
+def test_dedupe_keeps_one_copy_preferring_the_company_in_the_title():
+    # PayPay 側の方が新しいが、タイトルに会社名があるソフトバンク側を残す
+    in_paypay = _item("1", "ソフトバンク、新料金プランを発表 - 日経", published=1_760_000_500)
+    in_softbank = _item("2", "ソフトバンク、新料金プランを発表 - ロイター")
+    only_softbank = _item("3", "ソフトバンク決算 純利益が過去最高")
+    only_paypay = _item("4", "PayPayドームで開幕戦")
+    data = {"PayPay": [in_paypay, only_paypay], "ソフトバンク": [in_softbank, only_softbank]}
+
+    result = dedupe(data)
+    assert result == {"PayPay": [only_paypay], "ソフトバンク": [in_softbank, only_softbank]}
+    assert list(result) == list(data)
+
+
+def test_dedupe_prefers_newest_then_company_order():
+    older = _item("1", "電通と博報堂、共同で新会社 - 日経")
+    newer = _item("2", "電通と博報堂、共同で新会社 - 共同通信", published=1_760_000_500)
+    assert dedupe({"広告": [older], "メディア": [newer]}) == {"広告": [], "メディア": [newer]}
+    # 同じ記事が2社の検索に出たら、先に並ぶ会社に残す
+    first, second = _item("5", "電通と博報堂、共同で新会社"), _item("5", "電通と博報堂、共同で新会社")
+    assert dedupe({"広告": [first], "メディア": [second]}) == {"広告": [first], "メディア": []}
@@ -0,0 +1,72 @@
+"""軽量 RSS パーサー（fastparse）のテスト"""
+from datetime import datetime
+
+import feedparser
+import pytest
+
+import fastparse
+
+# Google ニュースの検索フィードと同じ形（guid は isPermaLink="false"、タイトルは「見出し - 媒体名」）
+GOOGLE_NEWS_FEED = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/">
+<channel>
+<generator>NFE/5.0</generator>
+<title>"ソフトバンク" - Google ニュース</title>
+<link>https://news.google.com/search?q=%E3%82%BD%E3%83%95%E3%83%88%E3%83%90%E3%83%B3%E3%82%AF&amp;hl=ja&amp;gl=JP&amp;ceid=JP:ja</link>
+<language>ja</language>
+<webMaster>news-webmaster@google.com</webMaster>
+<copyright>Copyright © 2026 Google. All rights reserved.</copyright>
+<lastBuildDate>Sat, 17 Oct 2026 09:00:00 GMT</lastBuildDate>
+<description>Google ニュース</description>
+<item>
+<title>ソフトバンク、AI &amp; 通信の新サービスを発表 - 日本経済新聞</title>
+<link>https://news.google.com/rss/articles/CBMiAAA?oc=5</link>
+<guid isPermaLink="false">CBMiAAA</guid>
+<pubDate>Sat, 17 Oct 2026 08:30:00 GMT</pubDate>
+<description>&lt;a href="https://news.google.com/rss/articles/CBMiAAA?oc=5" target="_blank"&gt;ソフトバンク、AI &amp;amp; 通信の新サービスを発表&lt;/a&gt;&amp;nbsp;&amp;nbsp;&lt;font color="#6f6f6f"&gt;日本経済新聞&lt;/font&gt;</description>
+<source url="https://www.nikkei.com">日本経済新聞</source>
+</item>
+<item>
+<title>ソフトバンク株が続伸 決算を好感 - ロイター</title>
+<link>https://news.google.com/rss/articles/CBMiBBB?oc=5</link>
+<guid isPermaLink="false">CBMiBBB</guid>
+<pubDate>Fri, 16 Oct 2026 23:15:00 +0900</pubDate>
+<description>決算を好感</description>
+<source url="https://jp.reuters.com">ロイター</source>
+</item>
+</channel>
+</rss>
+""".encode("utf-8")
+
+
+def _fields(entries):
+    return [(e.id, e.title, e.link, tuple(e.published_parsed)) for e in entries]
+
+
+def test_fastparse_matches_feedparser():
+    fast = fastparse.parse(GOOGLE_NEWS_FEED)
+    full = feedparser.parse(GOOGLE_NEWS_FEED)
+    assert fast is not None
+    assert len(fast.entries) == 2
+    assert _fields(fast.entries) == _fields(full.entries)
+
+
+def test_fastparse_skips_entries_outside_window():
+    since = datetime(2026, 10, 17).timestamp()
+    fast = fastparse.parse(GOOGLE_NEWS_FEED, since=since)
+    assert [e.id for e in fast.entries] == ["CBMiAAA"]
+
+
+@pytest.mark.parametrize("body", [
+    # RSS ではない（Atom）
+    b'<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom"><title>t</title></feed>',
+    # link のない記事
+    b'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title>'
+    b'<item><title>a</title><pubDate>Sat, 17 Oct 2026 08:30:00 GMT</pubDate></item></channel></rss>',
+    # 壊れた XML
+    b'<?xml version="1.0"?><rss version="2.0"><channel><item><title>a</title>',
+    # 空の応答
+    b'',
+])
+def test_fastparse_falls_back_on_unexpected_feed(body):
+    assert fastparse.parse(body) is None
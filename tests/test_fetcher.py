@@ -0,0 +1,39 @@
+"""取得の部品（fetcher）のテスト"""
+import pytest
+
+from fetcher import Backoff, TokenBucket
+
+
+def test_token_bucket_allows_burst_then_waits(monkeypatch):
+    clock = [100.0]
+    waits = []
+    monkeypatch.setattr("fetcher.time.monotonic", lambda: clock[0])
+
+    def sleep(seconds):
+        waits.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr("fetcher.time.sleep", sleep)
+    bucket = TokenBucket(rate=2.0, burst=2)
+    for _ in range(3):
+        bucket.acquire()
+    assert waits == [0.5]
+
+
+@pytest.mark.parametrize("rate", [0, -1])
+def test_token_bucket_rejects_non_positive_rate(rate):
+    with pytest.raises(ValueError):
+        TokenBucket(rate, 1)
+
+
+def test_backoff_is_capped_and_stops_at_deadline(monkeypatch):
+    backoff = Backoff(base=1.0, cap=4.0)
+    monkeypatch.setattr("fetcher.random.uniform", lambda low, high: high)
+    assert [backoff.delay(attempt) for attempt in range(4)] == [1.0, 2.0, 4.0, 4.0]
+
+    waits = []
+    monkeypatch.setattr("fetcher.time.sleep", waits.append)
+    monkeypatch.setattr("fetcher.time.monotonic", lambda: 10.0)
+    backoff.sleep(3, deadline=11.5)
+    backoff.sleep(3, deadline=9.0)
+    assert waits == [1.5, 0.0]
@@ -0,0 +1,34 @@
+"""ファイルの書き出し（fileio）のテスト"""
+import os
+import stat
+
+import pytest
+
+from fileio import write_atomic
+
+
+@pytest.mark.parametrize("content, expected", [
+    ("記事", "記事".encode("utf-8")),
+    (b"\x00\x01", b"\x00\x01"),
+    (iter(["<html>", "本文", "</html>"]), "<html>本文</html>".encode("utf-8")),
+])
+def test_write_atomic_writes_content(tmp_path, content, expected):
+    path = tmp_path / "sub" / "out.txt"
+    assert write_atomic(str(path), content) == len(expected)
+    assert path.read_bytes() == expected
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+    assert os.listdir(path.parent) == ["out.txt"]
+
+
+def test_write_atomic_keeps_old_file_and_no_temp_on_failure(tmp_path):
+    path = tmp_path / "index.html"
+    path.write_text("前回", encoding="utf-8")
+
+    def fragments():
+        yield "書きかけ"
+        raise RuntimeError("生成エラー")
+
+    with pytest.raises(RuntimeError):
+        write_atomic(str(path), fragments())
+    assert path.read_text(encoding="utf-8") == "前回"
+    assert os.listdir(tmp_path) == ["index.html"]
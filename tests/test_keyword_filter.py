@@ -0,0 +1,54 @@
+"""キーワードフィルタ（keyword_filter）のテスト"""
+import json
+
+import feedparser
+import pytest
+
+from keyword_filter import KeywordFilter, compile_keywords, load_filters
+
+
+def test_compile_keywords_prunes_longer_keywords_with_a_shorter_prefix():
+    pattern = compile_keywords(["ホークス", "ホーク", "野球", "ab", "abc", "abd", ""])
+    assert pattern.pattern == "(?:ab|ホーク|野球)"
+
+
+def test_compile_keywords_shares_prefixes_and_escapes():
+    pattern = compile_keywords(["登録", "登録抹消", "登板", "c++"])
+    assert pattern.pattern == r"(?:c\+\+|登(?:板|録))"
+    assert pattern.search("c++ の新機能")
+    assert not pattern.search("c の新機能")
+
+
+def test_compile_keywords_without_keywords():
+    assert compile_keywords([]) is None
+    assert compile_keywords([""]) is None
+
+
+@pytest.mark.parametrize("title, kept", [
+    ("ソフトバンク、決算を発表", True),
+    ("ソフトバンク 1軍に昇格", False),     # 全角の「１軍」と同じ
+    ("ＦＡ権を行使", False),               # 全角英字と大文字小文字を区別しない
+    ("fa権の行使を表明", False),
+    ("ﾎｰｸｽが勝利", False),                # 半角カナ
+])
+def test_keyword_filter_matches_after_nfkc(title, kept):
+    rules = KeywordFilter(exclude=["１軍", "FA権", "ホークス"])
+    assert rules.keep(title) is kept
+
+
+def test_keyword_filter_include_and_exclude():
+    rules = KeywordFilter(exclude=["野球"], include=["ソフトバンク", "SoftBank"])
+    assert rules.keep("SOFTBANK グループの決算")
+    assert not rules.keep("ソフトバンクの野球")
+    assert not rules.keep("通信各社の決算")
+    entries = [feedparser.FeedParserDict(title=title) for title in ("ソフトバンク決算", "ソフトバンクの野球")]
+    assert rules.apply(entries) == entries[:1]
+
+
+def test_load_filters(tmp_path):
+    path = tmp_path / "filters.json"
+    path.write_text(json.dumps({"ソフトバンク": {"exclude": ["ホークス"]}}, ensure_ascii=False), encoding="utf-8")
+    filters = load_filters(str(path))
+    assert set(filters) == {"ソフトバンク"}
+    assert not filters["ソフトバンク"].keep("ホークス勝利")
+    assert load_filters(str(tmp_path / "missing.json")) == {}
@@ -0,0 +1,64 @@
+"""1ソースの取得（get_news_for_company）のテスト。download を差し替えてネットワークには接続しない"""
+import pytest
+
+import main
+from breaker import CircuitBreaker
+from fetcher import Backoff, Response
+from metrics import RunMetrics
+
+OLD_ITEM_FEED = (b'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title><link>https://example.com</link>'
+                 b'<item><title>a</title><link>https://example.com/a</link><guid>a</guid>'
+                 b'<pubDate>Mon, 01 Jan 2001 00:00:00 GMT</pubDate></item></channel></rss>')
+EMPTY_FEED = b'<?xml version="1.0"?><rss version="2.0"><channel><title>t</title><link>https://example.com</link></channel></rss>'
+
+
+class MemoryCache:
+    """FeedCache と同じ呼び出し方で、保存した内容を持っておくだけのキャッシュ"""
+
+    def __init__(self):
+        self.stored = {}
+
+    def validators(self, url):
+        return None, None
+
+    def entries(self, url):
+        return None
+
+    def store(self, url, entries, etag=None, modified=None):
+        self.stored[url] = (list(entries), etag, modified)
+
+
+def _fetch(body, tmp_path, headers=None, parser="fast"):
+    calls = []
+
+    def download(url, **kwargs):
+        calls.append(url)
+        return Response(200, headers or {}, body)
+
+    breaker = CircuitBreaker(tmp_path / "breakers.json")
+    cache = MemoryCache()
+    metrics = RunMetrics()
+    entries = main.get_news_for_company("A", "https://example.com/rss", cache=cache, breaker=breaker,
+                                        backoff=Backoff(0, 0), metrics=metrics, parser=parser,
+                                        download=download)
+    return entries, len(calls), metrics.source("A").status, breaker.failures("A"), cache.stored
+
+
+def test_unreadable_response_counts_as_failure(tmp_path):
+    entries, calls, status, failures, stored = _fetch(b"<html>captcha</html>", tmp_path)
+    assert entries == []
+    assert calls == main.MAX_RETRIES
+    assert status == "failed"
+    assert failures == 1
+    assert stored == {}
+
+
+# fast は期間外の記事を読み飛ばす。feedparser は期間で絞らないので、記事のないフィードで確かめる
+@pytest.mark.parametrize("parser, body", [("fast", OLD_ITEM_FEED), ("fast", EMPTY_FEED), ("feedparser", EMPTY_FEED)])
+def test_feed_without_items_in_window_is_empty_without_retry(tmp_path, parser, body):
+    entries, calls, status, failures, stored = _fetch(body, tmp_path, {"etag": '"v1"'}, parser)
+    assert entries == []
+    assert calls == 1
+    assert status == "empty"
+    assert failures == 0
+    assert stored == {"https://example.com/rss": ([], '"v1"', None)}
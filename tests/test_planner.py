@@ -0,0 +1,49 @@
+"""取得計画（planner）のテスト"""
+import feedparser
+
+from planner import FetchPlan, plan_queries, search_query, split_entries
+
+GOOGLE_NEWS = "https://news.google.com/rss/search?q={}&hl=ja&gl=JP&ceid=JP:ja"
+SOURCES = {
+    "トヨタ": GOOGLE_NEWS.format("トヨタ"),
+    "ソニー 半導体": GOOGLE_NEWS.format("ソニー+半導体"),
+    "独自フィード": "https://example.com/feed.xml",
+    "任天堂": GOOGLE_NEWS.format("任天堂"),
+}
+
+
+def test_plan_queries_batches_search_feeds_with_window():
+    plans = plan_queries(SOURCES, batch_size=2, window_days=30)
+    assert [plan.members for plan in plans] == [("トヨタ", "ソニー 半導体"), ("独自フィード",), ("任天堂",)]
+    assert search_query(plans[0].url) == "トヨタ OR (ソニー 半導体) when:30d"
+    assert plans[0].terms == (("トヨタ",), ("ソニー", "半導体"))
+    # 検索フィードでない URL はそのまま1件ずつ取得する
+    assert plans[1].url == "https://example.com/feed.xml"
+    assert search_query(plans[2].url) == "任天堂 when:30d"
+
+
+def test_plan_queries_without_batching_keeps_urls():
+    plans = plan_queries(SOURCES)
+    assert [plan.key for plan in plans] == list(SOURCES)
+    assert [search_query(plan.url) for plan in plans] == ["トヨタ", "ソニー 半導体", None, "任天堂"]
+
+
+def _entry(title):
+    return feedparser.FeedParserDict(title=title)
+
+
+def test_split_entries_single_member_keeps_everything():
+    plan = FetchPlan("ソフトバンク", "https://example.com", ("ソフトバンク",), ())
+    entries = [_entry("ホークス勝利"), _entry("ソフトバンク決算")]
+    assert split_entries(plan, entries) == {"ソフトバンク": entries}
+
+
+def test_split_entries_assigns_by_all_terms():
+    plan = FetchPlan("トヨタ+ソニー", "https://example.com", ("トヨタ", "ソニー"),
+                     (("トヨタ",), ("ソニー", "半導体")))
+    toyota = _entry("トヨタ、新型車を発表")
+    sony = _entry("ソニー 半導体の新工場")
+    sony_other = _entry("ソニーの新型ゲーム機")   # 「半導体」がないのでどちらにも入らない
+    both = _entry("トヨタとソニー、半導体で提携")
+    split = split_entries(plan, [toyota, sony, sony_other, both])
+    assert split == {"トヨタ": [toyota, both], "ソニー": [sony, both]}
@@ -0,0 +1,91 @@
+"""見出しの検索索引（search_index）のテスト"""
+import json
+import time
+
+import feedparser
+
+from keyword_filter import KeywordFilter
+from models import NewsItem
+from search_index import SearchIndex, bigrams, update_search_index
+from store import ArticleStore
+
+
+def _entry(guid, title, published=None):
+    return feedparser.FeedParserDict(id=guid, title=title, link=f"https://example.com/{guid}",
+                                     published_parsed=time.gmtime(published or time.time()))
+
+
+def test_update_search_index_applies_filters(tmp_path):
+    path = str(tmp_path / "search.json")
+    store = ArticleStore(":memory:")
+    store.upsert("ソフトバンク", [_entry("1", "ソフトバンク決算"), _entry("2", "ホークス勝利")])
+    since = time.time() - 3600
+
+    assert update_search_index(store, since, path)[:2] == (2, 0)
+    # 後から足したルールは、索引に入っている記事にも掛かる
+    filters = {"ソフトバンク": KeywordFilter(exclude=["ホークス"])}
+    assert update_search_index(store, since, path, filters)[:2] == (0, 1)
+    store.upsert("ソフトバンク", [_entry("3", "ホークス連勝"), _entry("4", "ソフトバンク新サービス")])
+    assert update_search_index(store, since, path, filters)[:2] == (1, 0)
+    index = SearchIndex.load(path)
+    assert sorted(doc[1] for doc in index.docs.values()) == ["ソフトバンク新サービス", "ソフトバンク決算"]
+    assert "ホー" not in index.postings
+
+
+def _item(guid, title, published):
+    return NewsItem.create(guid, title, f"https://example.com/{guid}", published)
+
+
+def test_bigrams_use_code_points():
+    assert bigrams("𠮷野家！") == {"𠮷野", "野家"}
+    assert bigrams("ＡＢ c") == {"ab", "bc"}
+    assert bigrams("a") == set()
+
+
+def test_postings_are_delta_encoded_and_round_trip(tmp_path):
+    path = str(tmp_path / "search.json")
+    index = SearchIndex()
+    index.add(3, "トヨタ", _item("a", "トヨタ新型車", 100))
+    index.add(10, "ソニー", _item("b", "ソニー新型機", 200))
+    index.add(25, "トヨタ", _item("c", "トヨタ新型EV", 300))
+    assert index.save(path)
+    assert not index.save(path)   # 内容が同じなら書き直さない
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["postings"]["新型"] == [3, 7, 15]
+    assert data["companies"] == ["トヨタ", "ソニー"]
+
+    loaded = SearchIndex.load(path)
+    assert loaded.postings == index.postings
+    assert loaded.docs == index.docs
+    assert loaded.last_rowid == 25
+
+    assert loaded.expire(150) == 1
+    assert loaded.postings["新型"] == [10, 25]
+    assert "トヨ" in loaded.postings and "タ新" in loaded.postings
+    assert loaded.expire(400) == 2
+    assert loaded.postings == {} and loaded.docs == {}
+
+
+def test_load_ignores_broken_or_old_index(tmp_path):
+    path = tmp_path / "search.json"
+    assert SearchIndex.load(str(path)).docs == {}
+    path.write_text("{", encoding="utf-8")
+    assert SearchIndex.load(str(path)).last_rowid == 0
+    path.write_text(json.dumps({"version": 0, "last_rowid": 5}), encoding="utf-8")
+    assert SearchIndex.load(str(path)).last_rowid == 0
+
+
+def test_update_search_index_rebuilds_when_store_is_recreated(tmp_path):
+    path = str(tmp_path / "search.json")
+    since = time.time() - 3600
+    store = ArticleStore(":memory:")
+    store.upsert("トヨタ", [_entry(str(i), f"トヨタ記事{i}") for i in range(3)])
+    assert update_search_index(store, since, path)[0] == 3
+    assert update_search_index(store, since, path) == (0, 0, False)
+
+    fresh = ArticleStore(":memory:")
+    fresh.upsert("トヨタ", [_entry("x", "トヨタ新記事")])
+    assert update_search_index(fresh, since, path)[0] == 1
+    assert [doc[1] for doc in SearchIndex.load(path).docs.values()] == ["トヨタ新記事"]
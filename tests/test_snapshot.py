@@ -0,0 +1,51 @@
+"""応答の記録と再生（snapshot）のテスト"""
+import gzip
+import json
+
+import pytest
+
+from fetcher import Response
+from snapshot import SnapshotMiss, SnapshotRecorder, SnapshotReplay
+
+FEED = "<rss version='2.0'><channel><title>ソフトバンク</title></channel></rss>".encode("utf-8")
+BINARY = b"\x1f\x8b\x00\xff"   # UTF-8 として読めない本文
+
+
+def test_record_then_replay_returns_the_same_responses(tmp_path):
+    path = str(tmp_path / "snap" / "run.json.gz")
+    responses = {
+        "https://example.com/a": Response(200, {"etag": '"v1"', "content-type": "application/rss+xml"}, FEED),
+        "https://example.com/b": Response(503, {}, BINARY),
+    }
+    calls = []
+
+    def download(url, etag=None, modified=None, timeout=None):
+        calls.append((url, etag, timeout))
+        return responses[url]
+
+    recorder = SnapshotRecorder(path)
+    recording_download = recorder.wrap(download)
+    for url in responses:
+        assert recording_download(url, timeout=5) is responses[url]
+    assert calls == [(url, None, 5) for url in responses]
+    assert recorder.save() == 2
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    assert "body" in data["responses"]["https://example.com/a"]
+    assert "body_b64" in data["responses"]["https://example.com/b"]
+
+    replay = SnapshotReplay.load(path)
+    for url, response in responses.items():
+        # 条件付き GET の指定は無視して、記録した応答をそのまま返す
+        assert replay.download(url, etag='"old"', timeout=1, deadline=0) == response
+    with pytest.raises(SnapshotMiss):
+        replay.download("https://example.com/missing")
+
+
+def test_replay_rejects_other_versions(tmp_path):
+    path = tmp_path / "old.json.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump({"version": 0, "recorded_at": 0, "responses": {}}, f)
+    with pytest.raises(ValueError):
+        SnapshotReplay.load(str(path))